@@ -0,0 +1,53 @@
+# //benchmarks/bench_bank_statement_regex.py
+# [Version 15-10-2026 09:00:00]
+# Benchmark for the bank statement transaction pattern
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+import os
+import re
+import sys
+import random
+import timeit
+
+# Make the project root importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from functions.document_processing_tools import _TXN_RE
+
+# one: original unanchored pattern with a greedy description class containing \s
+ONE = re.compile(r'(\d{2}/\d{2}/\d{4})\s+([A-Za-z\s]+)\s+£?([0-9,]+\.?[0-9]*)')
+
+# two: original pattern anchored to line starts only
+TWO = re.compile(r'^(\d{2}/\d{2}/\d{4})\s+([A-Za-z\s]+)\s+£?([0-9,]+\.?[0-9]*)', re.MULTILINE)
+
+# three: current pattern used by DocumentProcessor
+THREE = _TXN_RE
+
+DESCRIPTIONS = [
+    "Salary Payment ACME", "Boiler repair", "Dividend Income", "Coffee Shop",
+    "Professional fees", "Rental income flat", "Home insurance", "Interest",
+    "Card payment to TESCO STORES 2041", "Transfer ref 88213 to savings"
+]
+
+def build_statement(lines: int = 10000, seed: int = 42) -> str:
+    """Build a synthetic statement with a mix of matching and noise lines"""
+    rng = random.Random(seed)
+    rows = ["Bank Statement - Current Account"]
+    for i in range(lines):
+        day = rng.randint(1, 28)
+        month = rng.randint(1, 12)
+        desc = rng.choice(DESCRIPTIONS)
+        amount = rng.uniform(1, 5000)
+        if i % 7 == 0:
+            rows.append(f"Page {i // 7} of statement continued overleaf")
+        rows.append(f"{day:02d}/{month:02d}/2024 {desc} £{amount:,.2f} {amount * 3:,.2f}")
+    return "\n".join(rows)
+
+def main():
+    text = build_statement()
+    for name, pattern in [("one", ONE), ("two", TWO), ("three", THREE)]:
+        seconds = min(timeit.repeat(lambda: pattern.findall(text), number=5, repeat=3)) / 5
+        print(f"{name:>5}: {seconds * 1000:8.2f} ms  ({len(pattern.findall(text))} matches)")
+
+if __name__ == "__main__":
+    main()
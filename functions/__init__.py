@@ -0,0 +1,4 @@
+# //functions/__init__.py
+# [Version 15-10-2026 09:00:00]
+# Core function modules for TaxOptim AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
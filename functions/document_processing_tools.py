@@ -6,11 +6,106 @@
 import re
 import json
 import os
+import mmap
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional
+from dataclasses import dataclass, fields
 
-@dataclass
+import numpy as np
+import pandas as pd
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# google-re2 matches in linear time, so adversarial OCR text cannot trigger
+# catastrophic backtracking. It rejects lookaround and backreferences, and
+# takes inline flags such as (?m) rather than re module flags.
+_linear_re = re2 if re2 is not None else re
+
+# Regex patterns are compiled once at import so batch processing does not
+# pay the compile/cache lookup cost per document
+
+# P60 fields are matched by one alternation scanned once over the text. Each
+# branch is a zero-width lookahead so overlapping fields (e.g. an employer name
+# running into the NINO) are still found, exactly as with separate searches.
+_P60_FIELD_PATTERNS = [
+    r'total pay.*?£?(?P<total_pay>[0-9,]+\.?[0-9]*)',
+    r'income tax.*?£?(?P<income_tax>[0-9,]+\.?[0-9]*)',
+    r'national insurance.*?£?(?P<national_insurance>[0-9,]+\.?[0-9]*)',
+    r'pension.*?£?(?P<pension_contributions>[0-9,]+\.?[0-9]*)',
+    r'employer.*?(?P<employer_name>[A-Za-z\s]+)'
+]
+
+# Uses stdlib re because the lookahead branches are not supported by RE2
+_P60_COMBINED_RE = re.compile('|'.join(f'(?={pattern})' for pattern in _P60_FIELD_PATTERNS), re.IGNORECASE)
+
+_P60_TEXT_FIELDS = frozenset({'employer_name'})
+
+# The NINO and tax code are kept out of the lookahead alternation, sparing
+# every position of the text two more branches, and are found by their own
+# searches, which stop at the first match. Both accept ASCII letters in
+# either case, as the alternation did
+_NINO_RE = re.compile(r'[A-Za-z]{2}[0-9]{6}[A-Za-z]')
+_TAX_CODE_RE = re.compile(r'(?i:tax code)[^\n0-9]*([0-9]+[A-Za-z]?)', re.ASCII)
+
+# Transactions are anchored to the start of a line (after any indentation
+# left by PDF or column extraction) and the description cannot cross a line
+# break, so a non-matching line fails fast instead of the engine backtracking
+# across the rest of the statement
+_TXN_RE = _linear_re.compile(r'(?m)^[ \t]*(\d{2}/\d{2}/\d{4})[ \t]+([A-Za-z \t]+)[ \t]£?([0-9,]+\.?[0-9]*)')
+
+# Transaction keywords are matched in one pass over each description and
+# mapped to a category tag
+_TXN_KEYWORD_TAGS = {
+    'salary': 'income_employment',
+    'dividend': 'income_investment',
+    'interest': 'income_investment',
+    'rental': 'income_investment',
+    'professional': 'expense_business',
+    'repair': 'expense_property',
+    'insurance': 'expense_property',
+    'travel': 'expense_property'
+}
+
+_TXN_KEYWORD_RE = _linear_re.compile('(?i)' + '|'.join(_TXN_KEYWORD_TAGS))
+
+# Column order of the per-transaction tag mask
+_TXN_TAGS = ('income_employment', 'income_investment', 'expense_business', 'expense_property')
+
+# Document type indicators: group 1 identifies a P60, group 2 a bank statement
+_DOC_TYPE_RE = _linear_re.compile(
+    r'(?i)(p60|end of year certificate|annual statement)|(bank statement|account summary|current account)'
+)
+
+# Filename hints that settle the document type without scanning the text:
+# group 1 identifies a P60, group 2 a bank statement. Hints must stand as
+# their own token so names like "Embankment" or "sp600" do not match.
+# "statement" alone is not a hint because P60s are also issued as annual
+# statements
+_FILENAME_HINT_RE = re.compile(r'(?<![a-z0-9])(?:(p60)|(bank))(?![a-z0-9])', re.IGNORECASE)
+
+_AMOUNT_RE = _linear_re.compile(r'£([0-9,]+\.?[0-9]*)')
+
+_DOC_PATTERNS = {
+    "currency": _linear_re.compile(r'£?([0-9,]+\.?[0-9]*)'),
+    "date_uk": _linear_re.compile(r'(\d{1,2}/\d{1,2}/\d{4})'),
+    "nino": _linear_re.compile(r'([A-Z]{2}[0-9]{6}[A-Z])'),
+    "tax_code": _linear_re.compile(r'([0-9]+[A-Z]?)'),
+    "percentage": _linear_re.compile(r'([0-9]+\.?[0-9]*)%')
+}
+
+def _parse_amount(value: str) -> float:
+    """Parse a matched currency amount such as '52,345.67'"""
+    # str.replace is used rather than str.translate: for a single separator
+    # it is several times faster, and returns the same object when no comma
+    # is present
+    return float(value.replace(',', ''))
+
+@dataclass(slots=True, frozen=True)
 class DocumentMetadata:
     """Metadata for processed documents"""
     document_type: str
@@ -19,7 +114,7 @@ class DocumentMetadata:
     document_quality: str
     extraction_method: str
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExtractedData:
     """Structured extracted data from documents"""
     income_streams: List[Dict]
@@ -28,24 +123,40 @@ class ExtractedData:
     personal_details: Dict
     validation_flags: List[Dict]
 
+def _as_dict(instance) -> Dict:
+    """Shallow dict of a slotted dataclass, sharing field values like __dict__ did"""
+    return {field.name: getattr(instance, field.name) for field in fields(instance)}
+
 class DocumentProcessor:
     """Main document processing engine for tax documents"""
     
+    # Regex patterns for document processing, shared by all instances
+    document_patterns = _DOC_PATTERNS
+    
     def __init__(self, anthropic_api_key: str = None):
         self.anthropic_api_key = anthropic_api_key
-        self.document_patterns = self._load_document_patterns()
     
-    def process_document(self, file_path: str, document_type: str = None) -> Dict:
+    def process_document(self, file_path: str, document_type: str = None, include_raw_text: bool = True) -> Dict:
         """
         Main entry point for document processing
+        
+        When no text can be extracted the result is an error entry, as
+        for any other document that fails in a batch.
         """
         
-        # Extract text from document
-        extracted_text = self._extract_text(file_path)
+        # Extract text from document; a document with no text is reported as
+        # a failure rather than processed by its file name
+        try:
+            extracted_text = self._extract_text(file_path)
+        except (OSError, ValueError) as e:
+            return {
+                "error": f"Error extracting text: {e}",
+                "processed": False
+            }
         
-        # Determine document type if not provided
+        # Use an unambiguous filename hint before falling back to a text scan
         if not document_type:
-            document_type = self._identify_document_type(extracted_text)
+            document_type = self._filename_hint(file_path) or self._identify_document_type(extracted_text)
         
         # Process based on document type
         if document_type == "P60":
@@ -59,72 +170,95 @@ class DocumentProcessor:
         # Calculate confidence and quality metrics
         metadata = self._calculate_metadata(extracted_text, extracted_data, document_type)
         
-        return {
-            "metadata": metadata.__dict__,
-            "extracted_data": extracted_data.__dict__,
-            "raw_text": extracted_text[:1000],  # First 1000 chars for reference
+        result = {
+            "metadata": _as_dict(metadata),
+            "extracted_data": _as_dict(extracted_data),
             "processing_notes": self._generate_processing_notes(extracted_data)
         }
+        
+        if include_raw_text:
+            result["raw_text"] = extracted_text[:1000]  # First 1000 chars for reference
+        
+        return result
     
     def _extract_text(self, file_path: str) -> str:
-        """Extract text from various file formats"""
+        """Extract text from various file formats
+        
+        Raises ValueError for formats that need converting first, and
+        OSError or UnicodeDecodeError when the file cannot be read.
+        """
         
         file_extension = file_path.lower().split('.')[-1]
         
-        try:
-            if file_extension == 'txt':
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    return file.read()
-            elif file_extension == 'csv':
-                # Basic CSV reading
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    return file.read()
-            else:
-                # For MVP, require pre-converted text files
-                return f"File format {file_extension} requires manual conversion to text. Please convert to .txt or .csv format."
-                
-        except Exception as e:
-            return f"Error extracting text: {str(e)}"
+        if file_extension in ('txt', 'csv'):
+            # Text and basic CSV reading
+            return self._read_text_file(file_path)
+        
+        # For MVP, require pre-converted text files
+        raise ValueError(f"File format {file_extension} requires manual conversion to text. "
+                         "Please convert to .txt or .csv format.")
     
-    def _identify_document_type(self, text: str) -> str:
-        """Identify document type from extracted text"""
+    def _read_text_file(self, file_path: str) -> str:
+        """Read a UTF-8 file through a memory map, decoding straight into one str"""
         
-        text_lower = text.lower()
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = str(mapped, 'utf-8')
         
-        # P60 indicators
-        if any(indicator in text_lower for indicator in ['p60', 'end of year certificate', 'annual statement']):
-            return "P60"
+        # Match the universal newline handling of text-mode reads
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
         
-        # Bank statement indicators
-        if any(indicator in text_lower for indicator in ['bank statement', 'account summary', 'current account']):
-            return "bank_statement"
+        return text
+    
+    def _filename_hint(self, file_path: str) -> Optional[str]:
+        """Document type implied by the file name, or None if absent or ambiguous"""
         
-        # Default to general document
-        return "general"
+        hints = {
+            "P60" if match.group(1) else "bank_statement"
+            for match in _FILENAME_HINT_RE.finditer(os.path.basename(file_path))
+        }
+        
+        return hints.pop() if len(hints) == 1 else None
+    
+    def _identify_document_type(self, text: str) -> str:
+        """Identify document type from extracted text"""
+        
+        # Single case-insensitive scan. P60 indicators take precedence wherever
+        # they appear, so bank statement indicators are only remembered
+        document_type = "general"
+        for match in _DOC_TYPE_RE.finditer(text):
+            if match.group(1):
+                return "P60"
+            document_type = "bank_statement"
+        
+        return document_type
     
     def _process_p60(self, text: str) -> ExtractedData:
         """Process P60 annual tax statement"""
         
-        # Extract key figures using regex patterns
-        patterns = {
-            'total_pay': r'total pay.*?£?([0-9,]+\.?[0-9]*)',
-            'income_tax': r'income tax.*?£?([0-9,]+\.?[0-9]*)',
-            'national_insurance': r'national insurance.*?£?([0-9,]+\.?[0-9]*)',
-            'pension_contributions': r'pension.*?£?([0-9,]+\.?[0-9]*)',
-            'tax_code': r'tax code.*?([0-9]+[A-Z]?)',
-            'employer_name': r'employer.*?([A-Za-z\s]+)',
-            'nino': r'([A-Z]{2}[0-9]{6}[A-Z])'
-        }
-        
+        # Extract key figures in a single pass, keeping the first match per field
         extracted_values = {}
-        for key, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                value = match.group(1).replace(',', '')
-                try:
-                    extracted_values[key] = float(value) if key not in ['tax_code', 'employer_name', 'nino'] else value
-                except ValueError:
-                    extracted_values[key] = value
+        for match in _P60_COMBINED_RE.finditer(text):
+            key = match.lastgroup
+            if key in extracted_values:
+                continue
+            value = match.group(key)
+            try:
+                extracted_values[key] = value.replace(',', '') if key in _P60_TEXT_FIELDS else _parse_amount(value)
+            except ValueError:
+                extracted_values[key] = value.replace(',', '')
+            if len(extracted_values) == len(_P60_FIELD_PATTERNS):
+                break
+        
+        nino = _NINO_RE.search(text)
+        if nino is not None:
+            extracted_values['nino'] = nino.group()
+        tax_code = _TAX_CODE_RE.search(text)
+        if tax_code is not None:
+            extracted_values['tax_code'] = tax_code.group(1)
         
         # Structure the extracted data
         income_streams = [{
@@ -167,40 +301,78 @@ class DocumentProcessor:
     def _process_bank_statement(self, text: str) -> ExtractedData:
         """Process bank statement for tax-relevant transactions"""
         
-        # Extract transaction patterns
-        transaction_pattern = r'(\d{2}/\d{2}/\d{4})\s+([A-Za-z\s]+)\s+£?([0-9,]+\.?[0-9]*)'
-        transactions = re.findall(transaction_pattern, text)
-        
-        income_streams = []
-        expenses = []
-        
-        for date, description, amount in transactions:
-            amount_float = float(amount.replace(',', ''))
-            
-            # Categorize transactions
-            desc_lower = description.lower()
-            
-            # Income indicators
-            if any(keyword in desc_lower for keyword in ['salary', 'dividend', 'interest', 'rental']):
-                income_type = "Employment" if 'salary' in desc_lower else "Investment"
-                income_streams.append({
-                    "type": income_type,
-                    "source": description.strip(),
-                    "amount": amount_float,
-                    "date": date,
-                    "confidence": 0.70
-                })
-            
-            # Expense indicators
-            elif any(keyword in desc_lower for keyword in ['repair', 'insurance', 'professional', 'travel']):
-                expenses.append({
-                    "category": "Business" if 'professional' in desc_lower else "Property",
-                    "amount": amount_float,
-                    "date": date,
-                    "description": description.strip(),
-                    "allowable": True,
-                    "confidence": 0.65
-                })
+        # Stream matches straight into columns, without an intermediate list of
+        # match tuples, so amount conversion and categorisation run over arrays
+        # rather than one row at a time
+        columns = {"date": [], "description": [], "amount": []}
+        append_date, append_description, append_amount = (column.append for column in columns.values())
+        for match in _TXN_RE.finditer(text):
+            date, description, amount = match.groups()
+            append_date(date)
+            append_description(description)
+            append_amount(amount)
+        transactions = pd.DataFrame(columns)
+        
+        if transactions.empty:
+            return ExtractedData(
+                income_streams=[],
+                expenses=[],
+                tax_deductions={},
+                personal_details={},
+                validation_flags=[]
+            )
+        
+        dates = transactions["date"].to_numpy()
+        amounts = transactions["amount"].str.replace(",", "", regex=False).astype("float64").to_numpy()
+        
+        # Descriptions are held as a categorical index: statements repeat the
+        # same descriptions, so each unique one is stripped and keyword-scanned
+        # once and rows refer to it by code
+        codes, unique_descriptions = pd.factorize(transactions["description"])
+        descriptions = np.array([description.strip() for description in unique_descriptions], dtype=object)[codes]
+        
+        # Categorize transactions
+        unique_tags = [
+            {_TXN_KEYWORD_TAGS[keyword.lower()] for keyword in _TXN_KEYWORD_RE.findall(description)}
+            for description in unique_descriptions
+        ]
+        tag_mask = np.array([[tag in tags for tag in _TXN_TAGS] for tags in unique_tags], dtype=bool)[codes]
+        is_employment, is_investment, is_business, is_property = tag_mask.T
+        
+        # Income indicators
+        is_income = is_employment | is_investment
+        income_types = np.where(is_employment, "Employment", "Investment")
+        income_streams = [
+            {
+                "type": income_type,
+                "source": description,
+                "amount": amount,
+                "date": date,
+                "confidence": 0.70
+            }
+            for income_type, description, amount, date in zip(
+                income_types[is_income].tolist(), descriptions[is_income].tolist(),
+                amounts[is_income].tolist(), dates[is_income].tolist()
+            )
+        ]
+        
+        # Expense indicators
+        is_expense = ~is_income & (is_business | is_property)
+        categories = np.where(is_business, "Business", "Property")
+        expenses = [
+            {
+                "category": category,
+                "amount": amount,
+                "date": date,
+                "description": description,
+                "allowable": True,
+                "confidence": 0.65
+            }
+            for category, amount, date, description in zip(
+                categories[is_expense].tolist(), amounts[is_expense].tolist(),
+                dates[is_expense].tolist(), descriptions[is_expense].tolist()
+            )
+        ]
         
         return ExtractedData(
             income_streams=income_streams,
@@ -214,13 +386,13 @@ class DocumentProcessor:
         """Basic text processing for general documents"""
         
         # Look for currency amounts
-        amounts = re.findall(r'£([0-9,]+\.?[0-9]*)', text)
+        amounts = _AMOUNT_RE.findall(text)
         
         income_streams = []
         if amounts:
             # Assume first large amount is income
             try:
-                first_amount = float(amounts[0].replace(',', ''))
+                first_amount = _parse_amount(amounts[0])
                 if first_amount > 1000:  # Reasonable income threshold
                     income_streams.append({
                         "type": "General",
@@ -285,33 +457,66 @@ class DocumentProcessor:
         notes.append("MVP version - consider upgrading for enhanced OCR capabilities")
         
         return notes
+
+# Utility functions for document processing workflow
+@functools.lru_cache(maxsize=4)
+def _get_processor(anthropic_api_key: str = None) -> DocumentProcessor:
+    """Return a shared DocumentProcessor for the given API key"""
+    return DocumentProcessor(anthropic_api_key)
+
+# Total input size below which a batch is processed in-process. Extraction
+# runs at roughly 6 MB/s and pool start-up costs some 30 ms plus pickling,
+# so smaller batches finish sooner without worker processes
+_POOL_MIN_BYTES = 2 * 1024 * 1024
+
+def _total_size(file_paths: List[str]) -> int:
+    """Total size in bytes of the files that exist"""
+    total = 0
+    for file_path in file_paths:
+        try:
+            total += os.stat(file_path).st_size
+        except OSError:
+            pass
+    return total
+
+def _process_one(file_path: str, anthropic_api_key: str = None, include_raw_text: bool = True) -> Dict:
+    """Process a single document, recording any failure in the result"""
     
-    def _load_document_patterns(self) -> Dict:
-        """Load regex patterns for document processing"""
-        
+    try:
+        return _get_processor(anthropic_api_key).process_document(file_path, include_raw_text=include_raw_text)
+    except Exception as e:
         return {
-            "currency": r'£?([0-9,]+\.?[0-9]*)',
-            "date_uk": r'(\d{1,2}/\d{1,2}/\d{4})',
-            "nino": r'([A-Z]{2}[0-9]{6}[A-Z])',
-            "tax_code": r'([0-9]+[A-Z]?)',
-            "percentage": r'([0-9]+\.?[0-9]*)%'
+            "error": str(e),
+            "processed": False
         }
 
-# Utility functions for document processing workflow
-def batch_process_documents(file_paths: List[str], anthropic_api_key: str = None) -> Dict:
+def batch_process_documents(file_paths: List[str], anthropic_api_key: str = None,
+                            include_raw_text: bool = True) -> Dict:
     """Process multiple documents in batch"""
     
-    processor = DocumentProcessor(anthropic_api_key)
+    # Documents are independent, so large batches are spread over worker
+    # processes. A single document, a single CPU or a batch too small to pay
+    # for pool start-up stays in-process.
+    workers = min(len(file_paths), os.cpu_count() or 1)
+    if workers < 2 or _total_size(file_paths) < _POOL_MIN_BYTES:
+        return {file_path: _process_one(file_path, anthropic_api_key, include_raw_text) for file_path in file_paths}
+    
     results = {}
     
-    for file_path in file_paths:
-        try:
-            result = processor.process_document(file_path)
-            results[file_path] = result
-        except Exception as e:
-            results[file_path] = {
-                "error": str(e),
-                "processed": False
-            }
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            file_path: executor.submit(_process_one, file_path, anthropic_api_key, include_raw_text)
+            for file_path in file_paths
+        }
+        for file_path, future in futures.items():
+            # A failure outside process_document (a pickling error or a dead
+            # worker) is recorded against its document, as in-process errors are
+            try:
+                results[file_path] = future.result()
+            except Exception as e:
+                results[file_path] = {
+                    "error": str(e),
+                    "processed": False
+                }
     
     return results
@@ -3,11 +3,17 @@
 # Optimization Recommendation Engine Functions for TaxOptim AI (MVP Version)
 # Authored by: Sotiris Spyrou, CEO, VerityAI
 
+import sys
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from operator import itemgetter
+
+import numpy as np
+
+from .uk_tax_calculations import result_field
 
 class OptimizationPriority(Enum):
     CRITICAL = "Critical"
@@ -15,7 +21,20 @@ class OptimizationPriority(Enum):
     MEDIUM = "Medium"
     LOW = "Low"
 
-@dataclass
+# Recommendation categories, interned so every recommendation shares one
+# string object per category
+_CAT_PENSION_CONTRIBUTIONS = sys.intern("Pension Contributions")
+_CAT_TAX_FREE_INVESTMENTS = sys.intern("Tax-Free Investments")
+_CAT_PENSION_PLANNING = sys.intern("Pension Planning")
+_CAT_INVESTMENT_OPTIMIZATION = sys.intern("Investment Optimization")
+
+# Lists at least this long are scored and ordered with NumPy
+_VECTORIZED_SORT_THRESHOLD = 64
+
+# Priorities that place a recommendation on the immediate actions list
+_IMMEDIATE_PRIORITIES = frozenset({OptimizationPriority.CRITICAL, OptimizationPriority.HIGH})
+
+@dataclass(slots=True)
 class OptimizationRecommendation:
     """Individual optimization recommendation"""
     id: str
@@ -28,6 +47,14 @@ class OptimizationRecommendation:
     next_steps: List[str]
     requirements: List[str]
 
+@dataclass(slots=True, frozen=True)
+class TaxPositionContext:
+    """Figures the optimization analyses read from a tax calculation result"""
+    income_tax: float
+    pension_contributions: float
+    gross_income: float
+    dividend_income: float
+
 class TaxOptimizationEngine:
     """Tax optimization recommendation engine"""
     
@@ -39,34 +66,54 @@ class TaxOptimizationEngine:
         
         recommendations = []
         
+        # Read the nested tax calculation result once
+        context = self._extract_context(tax_data)
+        
         # Immediate optimization opportunities
-        immediate_opportunities = self._identify_immediate_opportunities(tax_data)
+        immediate_opportunities = self._identify_immediate_opportunities(context)
         recommendations.extend(immediate_opportunities)
         
         # Pension optimization
-        pension_recommendations = self._analyze_pension_optimization(tax_data)
+        pension_recommendations = self._analyze_pension_optimization(context)
         recommendations.extend(pension_recommendations)
         
         # Investment optimization
-        investment_recommendations = self._analyze_investment_optimization(tax_data)
+        investment_recommendations = self._analyze_investment_optimization(context)
         recommendations.extend(investment_recommendations)
         
         # Prioritize recommendations
         prioritized_recommendations = self._prioritize_recommendations(recommendations)
         
+        # Summary, immediate actions and roadmap in a single pass
+        optimization_summary, immediate_actions, implementation_roadmap = self._bucket_recommendations(
+            prioritized_recommendations
+        )
+        
         return {
-            "optimization_summary": self._generate_optimization_summary(prioritized_recommendations),
-            "immediate_actions": [r for r in prioritized_recommendations if r.priority in [OptimizationPriority.CRITICAL, OptimizationPriority.HIGH]],
+            "optimization_summary": optimization_summary,
+            "immediate_actions": immediate_actions,
             "all_recommendations": prioritized_recommendations,
-            "implementation_roadmap": self._generate_implementation_roadmap(prioritized_recommendations)
+            "implementation_roadmap": implementation_roadmap
         }
     
-    def _identify_immediate_opportunities(self, tax_data: Dict) -> List[OptimizationRecommendation]:
+    def _extract_context(self, tax_data: Dict) -> TaxPositionContext:
+        """Flatten the figures used by the analyses out of a tax calculation result"""
+        
+        income_tax_calc = tax_data.get('tax_calculations', {}).get('income_tax')
+        dividend_data = tax_data.get('income_breakdown', {}).get('dividends')
+        
+        return TaxPositionContext(
+            income_tax=tax_data.get('total_liability', {}).get('income_tax', 0),
+            pension_contributions=result_field(income_tax_calc, 'pension_contributions'),
+            gross_income=result_field(income_tax_calc, 'gross_income'),
+            dividend_income=result_field(dividend_data, 'dividend_income')
+        )
+    
+    def _identify_immediate_opportunities(self, context: TaxPositionContext) -> List[OptimizationRecommendation]:
         """Identify immediate tax year optimization opportunities"""
         
         recommendations = []
-        total_liability = tax_data.get('total_liability', {})
-        income_tax = total_liability.get('income_tax', 0)
+        income_tax = context.income_tax
         
         # Pension contribution opportunity
         if income_tax > 1000:
@@ -74,7 +121,7 @@ class TaxOptimizationEngine:
             
             recommendations.append(OptimizationRecommendation(
                 id="PENSION_2024_25",
-                category="Pension Contributions",
+                category=_CAT_PENSION_CONTRIBUTIONS,
                 title="Optimize 2024/25 Pension Contributions",
                 description="Maximize pension contributions before April 5th to reduce current year tax liability",
                 potential_saving=potential_saving,
@@ -91,7 +138,7 @@ class TaxOptimizationEngine:
         # ISA contribution opportunity
         recommendations.append(OptimizationRecommendation(
             id="ISA_2024_25",
-            category="Tax-Free Investments",
+            category=_CAT_TAX_FREE_INVESTMENTS,
             title="Maximize ISA Allowance",
             description="Use remaining ISA allowance for tax-free investment growth",
             potential_saving=0,  # Long-term benefit
@@ -107,14 +154,14 @@ class TaxOptimizationEngine:
         
         return recommendations
     
-    def _analyze_pension_optimization(self, tax_data: Dict) -> List[OptimizationRecommendation]:
+    def _analyze_pension_optimization(self, context: TaxPositionContext) -> List[OptimizationRecommendation]:
         """Analyze pension contribution optimization strategies"""
         
         recommendations = []
         
         # Current pension contributions
-        current_contributions = tax_data.get('tax_calculations', {}).get('income_tax', {}).get('pension_contributions', 0)
-        total_income = tax_data.get('tax_calculations', {}).get('income_tax', {}).get('gross_income', 0)
+        current_contributions = context.pension_contributions
+        total_income = context.gross_income
         
         # Calculate optimal contribution level
         max_annual_allowance = 60000
@@ -123,7 +170,7 @@ class TaxOptimizationEngine:
         if available_allowance > 1000 and total_income > 50000:
             recommendations.append(OptimizationRecommendation(
                 id="PENSION_OPTIMIZATION",
-                category="Pension Planning",
+                category=_CAT_PENSION_PLANNING,
                 title="Increase Pension Contributions",
                 description=f"Additional pension contributions could provide significant tax relief",
                 potential_saving=available_allowance * 0.4,
@@ -139,54 +186,84 @@ class TaxOptimizationEngine:
         
         return recommendations
     
-    def _analyze_investment_optimization(self, tax_data: Dict) -> List[OptimizationRecommendation]:
+    def _analyze_investment_optimization(self, context: TaxPositionContext) -> List[OptimizationRecommendation]:
         """Analyze investment structure optimization"""
         
         recommendations = []
         
         # Check dividend income
-        dividend_data = tax_data.get('income_breakdown', {}).get('dividends', {})
-        if isinstance(dividend_data, dict):
-            dividend_income = dividend_data.get('dividend_income', 0)
-            
-            if dividend_income > 1000:  # Above dividend allowance
-                recommendations.append(OptimizationRecommendation(
-                    id="INVESTMENT_STRUCTURE",
-                    category="Investment Optimization",
-                    title="Optimize Investment Structure",
-                    description="Consider tax-efficient investment wrappers to reduce dividend tax",
-                    potential_saving=dividend_income * 0.0875,
-                    priority=OptimizationPriority.MEDIUM,
-                    deadline=None,
-                    next_steps=[
-                        "Review current investment holdings",
-                        "Consider ISA transfers",
-                        "Evaluate pension vs ISA strategies"
-                    ],
-                    requirements=["Investment portfolio review"]
-                ))
+        dividend_income = context.dividend_income
+        
+        if dividend_income > 1000:  # Above dividend allowance
+            recommendations.append(OptimizationRecommendation(
+                id="INVESTMENT_STRUCTURE",
+                category=_CAT_INVESTMENT_OPTIMIZATION,
+                title="Optimize Investment Structure",
+                description="Consider tax-efficient investment wrappers to reduce dividend tax",
+                potential_saving=dividend_income * 0.0875,
+                priority=OptimizationPriority.MEDIUM,
+                deadline=None,
+                next_steps=[
+                    "Review current investment holdings",
+                    "Consider ISA transfers",
+                    "Evaluate pension vs ISA strategies"
+                ],
+                requirements=["Investment portfolio review"]
+            ))
         
         return recommendations
     
     def _prioritize_recommendations(self, recommendations: List[OptimizationRecommendation]) -> List[OptimizationRecommendation]:
         """Prioritize recommendations based on impact and deadlines"""
         
-        def priority_score(rec: OptimizationRecommendation) -> float:
-            base_score = rec.potential_saving / 10000  # Normalize to £10k
-            deadline_bonus = 0.5 if rec.deadline == "2025-04-05" else 0.0
-            return base_score + deadline_bonus
+        if len(recommendations) >= _VECTORIZED_SORT_THRESHOLD:
+            return self._prioritize_recommendations_vectorized(recommendations)
+        
+        # Score each recommendation once up front, then sort on the score alone.
+        # The sort is stable, so equal scores keep their original order
+        scored = [
+            (rec.potential_saving / 10000  # Normalize to £10k
+             + (0.5 if rec.deadline == "2025-04-05" else 0.0), rec)
+            for rec in recommendations
+        ]
+        scored.sort(key=itemgetter(0), reverse=True)
+        
+        return [rec for _, rec in scored]
+    
+    def _prioritize_recommendations_vectorized(self, recommendations: List[OptimizationRecommendation]) -> List[OptimizationRecommendation]:
+        """Prioritize a large recommendation list with array scoring and a stable argsort"""
+        
+        count = len(recommendations)
+        savings = np.fromiter((rec.potential_saving for rec in recommendations), dtype=np.float64, count=count)
+        deadline_bonus = np.fromiter(
+            (0.5 if rec.deadline == "2025-04-05" else 0.0 for rec in recommendations), dtype=np.float64, count=count
+        )
+        scores = savings / 10000 + deadline_bonus  # Normalize to £10k
         
-        return sorted(recommendations, key=priority_score, reverse=True)
+        # Stable sort on the negated score matches sort(reverse=True) on ties
+        order = np.argsort(-scores, kind="stable")
+        
+        return [recommendations[i] for i in order.tolist()]
     
-    def _generate_implementation_roadmap(self, recommendations: List[OptimizationRecommendation]) -> Dict:
-        """Generate implementation roadmap with timeline"""
+    def _bucket_recommendations(self, recommendations: List[OptimizationRecommendation]) -> Tuple[Dict, List[OptimizationRecommendation], Dict]:
+        """Build the optimization summary, immediate actions and implementation roadmap in one pass"""
         
+        total_potential_savings = 0
+        high_priority_count = 0
+        immediate_actions = []
         roadmap = {
             "immediate_actions": [],
             "medium_term_actions": []
         }
         
         for rec in recommendations:
+            total_potential_savings += rec.potential_saving
+            if rec.priority == OptimizationPriority.HIGH:
+                high_priority_count += 1
+            if rec.priority in _IMMEDIATE_PRIORITIES:
+                immediate_actions.append(rec)
+            
+            # Implementation roadmap with timeline
             if rec.deadline == "2025-04-05":
                 roadmap["immediate_actions"].append({
                     "title": rec.title,
@@ -200,20 +277,15 @@ class TaxOptimizationEngine:
                     "requirements": rec.requirements
                 })
         
-        return roadmap
-    
-    def _generate_optimization_summary(self, recommendations: List[OptimizationRecommendation]) -> Dict:
-        """Generate high-level optimization summary"""
-        
-        total_potential_savings = sum(r.potential_saving for r in recommendations)
-        high_priority_count = len([r for r in recommendations if r.priority == OptimizationPriority.HIGH])
-        
-        return {
+        # High-level optimization summary
+        summary = {
             "total_potential_savings": total_potential_savings,
             "immediate_opportunities": high_priority_count,
             "strategies_identified": len(recommendations),
             "implementation_timeline": "Immediate to 12 months"
         }
+        
+        return summary, immediate_actions, roadmap
 
 def generate_comprehensive_optimization_plan(tax_calculation_result: Dict, user_preferences: Dict = None) -> Dict:
     """Generate complete optimization plan with recommendations"""
@@ -4,11 +4,14 @@
 # Authored by: Sotiris Spyrou, CEO, VerityAI
 
 import json
+from bisect import bisect_left
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Tuple, Optional, Union
+from dataclasses import dataclass, field, fields
 
-@dataclass
+import numpy as np
+
+@dataclass(frozen=True, slots=True)
 class TaxThresholds:
     """2024/25 UK Tax Year Thresholds"""
     personal_allowance: float = 12570
@@ -30,17 +33,291 @@ class TaxThresholds:
     isa_allowance: float = 20000
     pension_annual_allowance: float = 60000
 
+# Thresholds are read-only, so every calculator shares one instance
+DEFAULT_THRESHOLDS = TaxThresholds()
+
+@dataclass(frozen=True, slots=True)
+class TaxBandTable:
+    """Income tax band edges and the marginal rate that applies above each edge"""
+    edges: Tuple[float, ...]
+    rates: Tuple[float, ...]
+    
+    @classmethod
+    def from_thresholds(cls, thresholds: TaxThresholds) -> 'TaxBandTable':
+        """Build the band table for a tax year's thresholds"""
+        return cls(
+            edges=(thresholds.personal_allowance, thresholds.basic_rate_threshold, thresholds.higher_rate_threshold),
+            rates=(0.0, thresholds.basic_rate, thresholds.higher_rate, thresholds.additional_rate)
+        )
+
+DEFAULT_BAND_TABLE = TaxBandTable.from_thresholds(DEFAULT_THRESHOLDS)
+
+class _CalculationResult:
+    """Base for calculation results, with a dict form for the final export"""
+    __slots__ = ()
+    
+    def to_dict(self) -> Dict:
+        """Return the result as a dict, converting nested results"""
+        result = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            result[f.name] = value.to_dict() if isinstance(value, _CalculationResult) else value
+        return result
+
+def result_field(result: Any, name: str, default: Any = 0) -> Any:
+    """Read a field from a calculation result or from its dict form
+    
+    Results may arrive as result objects, as their to_dict() output or as
+    JSON loaded from a saved report; a missing result gives the default.
+    """
+    if isinstance(result, _CalculationResult):
+        return getattr(result, name)
+    if isinstance(result, Mapping):
+        return result.get(name, default)
+    if result is None:
+        return default
+    raise TypeError(f"Expected a calculation result or mapping, got {type(result).__name__}")
+
+@dataclass(slots=True)
+class IncomeTaxResult(_CalculationResult):
+    """Income tax liability with reliefs and allowances"""
+    gross_income: float
+    pension_contributions: float
+    gift_aid_donations: float
+    gift_aid_gross: float
+    personal_allowance: float
+    taxable_income: float
+    tax_bands: Dict[str, float]
+    total_tax: float
+    effective_rate: float
+    marginal_rate: float
+
+@dataclass(slots=True)
+class NationalInsuranceResult(_CalculationResult):
+    """National Insurance contributions by class"""
+    employment_income: float
+    self_employment_income: float
+    class1_employee: float
+    class2_self_employed: float
+    class4_self_employed: float
+    total_ni: float
+
+@dataclass(slots=True)
+class CapitalGainsTaxResult(_CalculationResult):
+    """Capital Gains Tax liability"""
+    total_gross_gains: float
+    total_losses: float
+    net_gains_after_losses: float
+    annual_exempt_amount_used: float
+    taxable_gains: float
+    property_tax: float
+    other_gains_tax: float
+    total_cgt: float
+
+@dataclass(slots=True)
+class RentalIncomeResult(_CalculationResult):
+    """Rental profit and mortgage interest relief"""
+    gross_rental_income: float
+    allowable_expenses: float
+    property_allowance_used: float
+    net_rental_income: float
+    taxable_rental_profit: float
+    mortgage_interest: float
+    mortgage_interest_relief: float
+    property_allowance_election: bool
+
+@dataclass(slots=True)
+class DividendTaxResult(_CalculationResult):
+    """Dividend tax with allowance"""
+    dividend_income: float
+    dividend_allowance_used: float
+    taxable_dividends: float
+    dividend_tax: float
+    effective_dividend_rate: float
+
+@dataclass(slots=True)
+class RentalInputs:
+    """Rental property figures for a tax calculation"""
+    gross_income: float = 0
+    expenses: float = 0
+    mortgage_interest: float = 0
+    property_allowance_election: bool = False
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RentalInputs':
+        """Build rental inputs from the 'rental_income' section of income data"""
+        return cls(
+            gross_income=data.get('gross_income', 0),
+            expenses=data.get('expenses', 0),
+            mortgage_interest=data.get('mortgage_interest', 0),
+            property_allowance_election=data.get('property_allowance_election', False)
+        )
+
+@dataclass(slots=True)
+class IncomeInputs:
+    """Income and relief figures for a comprehensive tax calculation"""
+    employment_income: float = 0
+    self_employment_income: float = 0
+    pension_contributions: float = 0
+    gift_aid_donations: float = 0
+    dividends: float = 0
+    rental: RentalInputs = field(default_factory=RentalInputs)
+    capital_gains: List[Dict] = field(default_factory=list)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IncomeInputs':
+        """Build inputs from an income data dict, reading each key once"""
+        return cls(
+            employment_income=data.get('employment_income', 0),
+            self_employment_income=data.get('self_employment_income', 0),
+            pension_contributions=data.get('pension_contributions', 0),
+            gift_aid_donations=data.get('gift_aid_donations', 0),
+            dividends=data.get('investment_income', {}).get('dividends', 0),
+            rental=RentalInputs.from_dict(data.get('rental_income', {})),
+            capital_gains=data.get('capital_gains', [])
+        )
+
+# Disposal type codes for array-based capital gains calculations
+CGT_TYPE_OTHER = 0
+CGT_TYPE_PROPERTY = 1
+
+def _coerce_gains(gains_and_losses: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert a list of {'type', 'amount'} disposals to amount and type code arrays"""
+    count = len(gains_and_losses)
+    amounts = np.fromiter((item['amount'] for item in gains_and_losses), dtype=np.float64, count=count)
+    type_codes = np.fromiter(
+        (CGT_TYPE_PROPERTY if item['type'] == 'property' else CGT_TYPE_OTHER for item in gains_and_losses),
+        dtype=np.int8, count=count
+    )
+    return amounts, type_codes
+
+DIVIDEND_BASIC_RATE = 0.0875  # 8.75%
+DIVIDEND_HIGHER_RATE = 0.3375  # 33.75%
+DIVIDEND_ADDITIONAL_RATE = 0.3925  # 39.25%
+
+def _dividend_tax_basic(taxable_dividends: float) -> float:
+    """Dividend tax when total income is within the basic rate band"""
+    return taxable_dividends * DIVIDEND_BASIC_RATE
+
+def _dividend_tax_higher(taxable_dividends: float, basic_rate_remaining: float) -> float:
+    """Dividend tax when total income is within the higher rate band"""
+    basic_rate_dividends = basic_rate_remaining if basic_rate_remaining < taxable_dividends else taxable_dividends
+    return (basic_rate_dividends * DIVIDEND_BASIC_RATE
+            + (taxable_dividends - basic_rate_dividends) * DIVIDEND_HIGHER_RATE)
+
+def _dividend_tax_additional(taxable_dividends: float, basic_rate_remaining: float,
+                             higher_rate_limit: float) -> float:
+    """Dividend tax when total income reaches the additional rate band"""
+    tax = 0
+    remaining_dividends = taxable_dividends
+    
+    # Basic rate band
+    basic_rate_dividends = basic_rate_remaining if basic_rate_remaining < remaining_dividends else remaining_dividends
+    tax += basic_rate_dividends * DIVIDEND_BASIC_RATE
+    remaining_dividends -= basic_rate_dividends
+    
+    # Higher rate band
+    higher_rate_dividends = higher_rate_limit if higher_rate_limit < remaining_dividends else remaining_dividends
+    tax += higher_rate_dividends * DIVIDEND_HIGHER_RATE
+    remaining_dividends -= higher_rate_dividends
+    
+    # Additional rate band
+    tax += remaining_dividends * DIVIDEND_ADDITIONAL_RATE
+    
+    return tax
+
+def _personal_allowance(income: float, base_allowance: float) -> float:
+    """Personal allowance after the high income taper"""
+    
+    # Taper starts at £100,000
+    if income > 100000:
+        reduction = (income - 100000) * 0.5
+        tapered_allowance = base_allowance - reduction
+        return tapered_allowance if tapered_allowance > 0 else 0
+    
+    return base_allowance
+
+def _tax_bands(taxable_income: float, basic_rate_limit: float, higher_rate_limit: float,
+               basic_rate: float, higher_rate: float, additional_rate: float) -> Tuple[float, float, float]:
+    """Income tax in the basic, higher and additional rate bands"""
+    higher_rate_tax = 0
+    additional_rate_tax = 0
+    
+    remaining_income = taxable_income
+    
+    # Basic rate band
+    basic_rate_income = basic_rate_limit if basic_rate_limit < remaining_income else remaining_income
+    basic_rate_tax = basic_rate_income * basic_rate
+    remaining_income -= basic_rate_income
+    
+    # Higher rate band
+    if remaining_income > 0:
+        higher_band_width = higher_rate_limit - basic_rate_limit
+        higher_rate_income = higher_band_width if higher_band_width < remaining_income else remaining_income
+        higher_rate_tax = higher_rate_income * higher_rate
+        remaining_income -= higher_rate_income
+    
+    # Additional rate band
+    if remaining_income > 0:
+        additional_rate_tax = remaining_income * additional_rate
+    
+    return basic_rate_tax, higher_rate_tax, additional_rate_tax
+
+def _ni_contribution(income: float, threshold: float, upper_threshold: float,
+                     basic_rate: float, higher_rate: float) -> float:
+    """National Insurance on income between the thresholds and above the upper threshold"""
+    contribution = 0
+    if income > threshold:
+        # Basic rate band
+        basic_band = (upper_threshold if upper_threshold < income else income) - threshold
+        contribution += basic_band * basic_rate
+        
+        # Higher rate band
+        if income > upper_threshold:
+            higher_band = income - upper_threshold
+            contribution += higher_band * higher_rate
+    
+    return contribution
+
+# The Python kernels, by the names the compiled module uses, so the two can
+# be checked against each other
+_PYTHON_KERNELS = {
+    "dividend_tax_basic": _dividend_tax_basic,
+    "dividend_tax_higher": _dividend_tax_higher,
+    "dividend_tax_additional": _dividend_tax_additional,
+    "personal_allowance": _personal_allowance,
+    "tax_bands": _tax_bands,
+    "ni_contribution": _ni_contribution
+}
+
+# The scalar kernels above are also written in Cython for deployments that
+# want compiled single-call latency without numba; the compiled module is
+# used when it has been built with "python setup.py build_ext --inplace"
+# (see uk_tax_calculations_cy.pyx)
+try:
+    from .uk_tax_calculations_cy import (
+        dividend_tax_basic as _dividend_tax_basic,
+        dividend_tax_higher as _dividend_tax_higher,
+        dividend_tax_additional as _dividend_tax_additional,
+        personal_allowance as _personal_allowance,
+        tax_bands as _tax_bands,
+        ni_contribution as _ni_contribution
+    )
+except ImportError:
+    pass
+
 class UKTaxCalculator:
     """Comprehensive UK Tax Calculation Engine"""
     
     def __init__(self):
-        self.thresholds = TaxThresholds()
+        self.thresholds = DEFAULT_THRESHOLDS
+        self.band_table = DEFAULT_BAND_TABLE
         
     def calculate_income_tax(self, 
                            gross_income: float, 
                            pension_contributions: float = 0,
                            gift_aid_donations: float = 0,
-                           personal_allowance_adjustment: float = 0) -> Dict:
+                           personal_allowance_adjustment: float = 0) -> IncomeTaxResult:
         """Calculate income tax liability with reliefs and allowances"""
         
         # Calculate adjusted gross income after pension relief
@@ -56,7 +333,8 @@ class UKTaxCalculator:
         )
         
         # Calculate taxable income
-        taxable_income = max(0, adjusted_gross_income - personal_allowance)
+        taxable_income = adjusted_gross_income - personal_allowance
+        taxable_income = taxable_income if taxable_income > 0 else 0
         
         # Calculate tax bands with Gift Aid extension
         basic_rate_limit = self.thresholds.basic_rate_threshold + gift_aid_gross
@@ -66,71 +344,113 @@ class UKTaxCalculator:
         tax_breakdown = self._calculate_tax_bands(
             taxable_income, basic_rate_limit, higher_rate_limit
         )
-        
-        return {
-            "gross_income": gross_income,
-            "pension_contributions": pension_contributions,
-            "gift_aid_donations": gift_aid_donations,
-            "gift_aid_gross": gift_aid_gross,
-            "personal_allowance": personal_allowance,
-            "taxable_income": taxable_income,
-            "tax_bands": tax_breakdown,
-            "total_tax": sum(tax_breakdown.values()),
-            "effective_rate": sum(tax_breakdown.values()) / gross_income if gross_income > 0 else 0,
-            "marginal_rate": self._calculate_marginal_rate(extended_income)
-        }
+        total_tax = (tax_breakdown["basic_rate_tax"] + 
+                     tax_breakdown["higher_rate_tax"] + 
+                     tax_breakdown["additional_rate_tax"])
+        
+        return IncomeTaxResult(
+            gross_income=gross_income,
+            pension_contributions=pension_contributions,
+            gift_aid_donations=gift_aid_donations,
+            gift_aid_gross=gift_aid_gross,
+            personal_allowance=personal_allowance,
+            taxable_income=taxable_income,
+            tax_bands=tax_breakdown,
+            total_tax=total_tax,
+            effective_rate=total_tax / gross_income if gross_income > 0 else 0,
+            marginal_rate=self._calculate_marginal_rate(extended_income)
+        )
     
     def calculate_national_insurance(self, 
                                    employment_income: float,
-                                   self_employment_income: float = 0) -> Dict:
+                                   self_employment_income: float = 0) -> NationalInsuranceResult:
         """Calculate National Insurance contributions"""
         
+        thresholds = self.thresholds
+        
         # Class 1 Employee NI
-        class1_employee = 0
-        if employment_income > self.thresholds.ni_threshold:
-            # Basic rate band
-            basic_band = min(employment_income, self.thresholds.ni_upper_threshold) - self.thresholds.ni_threshold
-            class1_employee += basic_band * self.thresholds.ni_basic_rate
-            
-            # Higher rate band
-            if employment_income > self.thresholds.ni_upper_threshold:
-                higher_band = employment_income - self.thresholds.ni_upper_threshold
-                class1_employee += higher_band * self.thresholds.ni_higher_rate
+        class1_employee = _ni_contribution(
+            employment_income, thresholds.ni_threshold, thresholds.ni_upper_threshold,
+            thresholds.ni_basic_rate, thresholds.ni_higher_rate
+        )
         
         # Class 2 Self-Employed NI (£3.45 per week if profits between £6,515-£50,270)
         class2_self_employed = 0
         if 6515 <= self_employment_income <= 50270:
             class2_self_employed = 3.45 * 52  # £179.40 annually
         
-        # Class 4 Self-Employed NI
-        class4_self_employed = 0
-        if self_employment_income > self.thresholds.ni_threshold:
-            # Basic rate band
-            basic_band = min(self_employment_income, self.thresholds.ni_upper_threshold) - self.thresholds.ni_threshold
-            class4_self_employed += basic_band * 0.09  # 9% rate for Class 4
-            
-            # Higher rate band
-            if self_employment_income > self.thresholds.ni_upper_threshold:
-                higher_band = self_employment_income - self.thresholds.ni_upper_threshold
-                class4_self_employed += higher_band * self.thresholds.ni_higher_rate
+        # Class 4 Self-Employed NI (9% rate for Class 4)
+        class4_self_employed = _ni_contribution(
+            self_employment_income, thresholds.ni_threshold, thresholds.ni_upper_threshold,
+            0.09, thresholds.ni_higher_rate
+        )
         
-        return {
-            "employment_income": employment_income,
-            "self_employment_income": self_employment_income,
-            "class1_employee": class1_employee,
-            "class2_self_employed": class2_self_employed,
-            "class4_self_employed": class4_self_employed,
-            "total_ni": class1_employee + class2_self_employed + class4_self_employed
-        }
+        return NationalInsuranceResult(
+            employment_income=employment_income,
+            self_employment_income=self_employment_income,
+            class1_employee=class1_employee,
+            class2_self_employed=class2_self_employed,
+            class4_self_employed=class4_self_employed,
+            total_ni=class1_employee + class2_self_employed + class4_self_employed
+        )
     
     def calculate_capital_gains_tax(self, 
                                   gains_and_losses: List[Dict],
-                                  annual_exempt_amount: float = None) -> Dict:
-        """Calculate Capital Gains Tax liability"""
+                                  annual_exempt_amount: float = None,
+                                  type_codes: np.ndarray = None) -> CapitalGainsTaxResult:
+        """Calculate Capital Gains Tax liability
+        
+        gains_and_losses is a list of {'type', 'amount'} disposals, or, when
+        type_codes is given, an array of amounts with a matching array of
+        CGT_TYPE_* codes. Large portfolios are much cheaper as arrays;
+        _coerce_gains converts a list once for repeated calculations.
+        """
         
         if annual_exempt_amount is None:
             annual_exempt_amount = self.thresholds.cgt_allowance
         
+        if type_codes is not None:
+            # Classify every disposal at once with boolean masks
+            amounts = np.asarray(gains_and_losses, dtype=np.float64)
+            is_gain = amounts > 0
+            is_property = type_codes == CGT_TYPE_PROPERTY
+            total_property_gains = float(amounts[is_gain & is_property].sum())
+            total_other_gains = float(amounts[is_gain & ~is_property].sum())
+            total_losses = float(np.abs(amounts[~is_gain]).sum())
+        else:
+            total_property_gains, total_other_gains, total_losses = self._sum_gains_and_losses(gains_and_losses)
+        
+        total_gross_gains = total_property_gains + total_other_gains
+        
+        # Apply losses
+        net_gains_after_losses = total_gross_gains - total_losses
+        net_gains_after_losses = net_gains_after_losses if net_gains_after_losses > 0 else 0
+        
+        # Apply annual exempt amount
+        taxable_gains = net_gains_after_losses - annual_exempt_amount
+        taxable_gains = taxable_gains if taxable_gains > 0 else 0
+        
+        # Calculate tax (simplified - assumes basic rate taxpayer)
+        excess_gains = taxable_gains - total_property_gains
+        property_tax = (total_property_gains if total_property_gains < taxable_gains
+                        else taxable_gains) * self.thresholds.cgt_property_basic
+        other_tax = (excess_gains if excess_gains > 0 else 0) * self.thresholds.cgt_basic_rate
+        
+        return CapitalGainsTaxResult(
+            total_gross_gains=total_gross_gains,
+            total_losses=total_losses,
+            net_gains_after_losses=net_gains_after_losses,
+            annual_exempt_amount_used=(net_gains_after_losses if net_gains_after_losses < annual_exempt_amount
+                                       else annual_exempt_amount),
+            taxable_gains=taxable_gains,
+            property_tax=property_tax,
+            other_gains_tax=other_tax,
+            total_cgt=property_tax + other_tax
+        )
+    
+    def _sum_gains_and_losses(self, gains_and_losses: List[Dict]) -> Tuple[float, float, float]:
+        """Total property gains, other gains and losses from a list of disposals"""
+        
         # Separate property and other gains
         property_gains = []
         other_gains = []
@@ -148,42 +468,19 @@ class UKTaxCalculator:
                 else:
                     total_losses += abs(item['amount'])
         
-        # Calculate net gains
-        total_property_gains = sum(property_gains)
-        total_other_gains = sum(other_gains)
-        total_gross_gains = total_property_gains + total_other_gains
-        
-        # Apply losses
-        net_gains_after_losses = max(0, total_gross_gains - total_losses)
-        
-        # Apply annual exempt amount
-        taxable_gains = max(0, net_gains_after_losses - annual_exempt_amount)
-        
-        # Calculate tax (simplified - assumes basic rate taxpayer)
-        property_tax = min(taxable_gains, total_property_gains) * self.thresholds.cgt_property_basic
-        other_tax = max(0, taxable_gains - total_property_gains) * self.thresholds.cgt_basic_rate
-        
-        return {
-            "total_gross_gains": total_gross_gains,
-            "total_losses": total_losses,
-            "net_gains_after_losses": net_gains_after_losses,
-            "annual_exempt_amount_used": min(annual_exempt_amount, net_gains_after_losses),
-            "taxable_gains": taxable_gains,
-            "property_tax": property_tax,
-            "other_gains_tax": other_tax,
-            "total_cgt": property_tax + other_tax
-        }
+        return sum(property_gains), sum(other_gains), total_losses
     
     def calculate_rental_income_tax(self, 
                                   gross_rental_income: float,
                                   allowable_expenses: float,
                                   mortgage_interest: float,
-                                  property_allowance_election: bool = False) -> Dict:
+                                  property_allowance_election: bool = False) -> RentalIncomeResult:
         """Calculate rental income tax with mortgage interest relief"""
         
         if property_allowance_election:
             # Use property allowance instead of actual expenses
-            net_rental_income = max(0, gross_rental_income - 1000)
+            net_rental_income = gross_rental_income - 1000
+            net_rental_income = net_rental_income if net_rental_income > 0 else 0
             mortgage_interest_relief = 0  # No mortgage relief with property allowance
             actual_expenses_used = 0
         else:
@@ -193,170 +490,147 @@ class UKTaxCalculator:
             actual_expenses_used = allowable_expenses
         
         # Taxable rental profit (before mortgage interest relief)
-        taxable_rental_profit = max(0, net_rental_income)
-        
-        return {
-            "gross_rental_income": gross_rental_income,
-            "allowable_expenses": actual_expenses_used,
-            "property_allowance_used": 1000 if property_allowance_election else 0,
-            "net_rental_income": net_rental_income,
-            "taxable_rental_profit": taxable_rental_profit,
-            "mortgage_interest": mortgage_interest,
-            "mortgage_interest_relief": mortgage_interest_relief,
-            "property_allowance_election": property_allowance_election
-        }
+        taxable_rental_profit = net_rental_income if net_rental_income > 0 else 0
+        
+        return RentalIncomeResult(
+            gross_rental_income=gross_rental_income,
+            allowable_expenses=actual_expenses_used,
+            property_allowance_used=1000 if property_allowance_election else 0,
+            net_rental_income=net_rental_income,
+            taxable_rental_profit=taxable_rental_profit,
+            mortgage_interest=mortgage_interest,
+            mortgage_interest_relief=mortgage_interest_relief,
+            property_allowance_election=property_allowance_election
+        )
     
     def calculate_dividend_tax(self, 
                              dividend_income: float,
-                             total_income: float) -> Dict:
+                             total_income: float) -> DividendTaxResult:
         """Calculate dividend tax with allowance and appropriate rates"""
         
         # Apply dividend allowance
-        taxable_dividends = max(0, dividend_income - self.thresholds.dividend_allowance)
-        
-        # Determine tax rates based on total income position
-        basic_rate_remaining = max(0, self.thresholds.basic_rate_threshold - 
-                                 (total_income - dividend_income))
-        
-        dividend_basic_rate = 0.0875  # 8.75%
-        dividend_higher_rate = 0.3375  # 33.75%
-        dividend_additional_rate = 0.3925  # 39.25%
-        
-        # Calculate tax by bands
-        tax = 0
-        remaining_dividends = taxable_dividends
-        
-        # Basic rate band
-        basic_rate_dividends = min(remaining_dividends, basic_rate_remaining)
-        tax += basic_rate_dividends * dividend_basic_rate
-        remaining_dividends -= basic_rate_dividends
-        
-        # Higher rate band
-        higher_rate_limit = self.thresholds.higher_rate_threshold - self.thresholds.basic_rate_threshold
-        higher_rate_dividends = min(remaining_dividends, higher_rate_limit)
-        tax += higher_rate_dividends * dividend_higher_rate
-        remaining_dividends -= higher_rate_dividends
-        
-        # Additional rate band
-        tax += remaining_dividends * dividend_additional_rate
-        
-        return {
-            "dividend_income": dividend_income,
-            "dividend_allowance_used": min(dividend_income, self.thresholds.dividend_allowance),
-            "taxable_dividends": taxable_dividends,
-            "dividend_tax": tax,
-            "effective_dividend_rate": tax / dividend_income if dividend_income > 0 else 0
-        }
+        dividend_allowance = self.thresholds.dividend_allowance
+        taxable_dividends = dividend_income - dividend_allowance
+        taxable_dividends = taxable_dividends if taxable_dividends > 0 else 0
+        
+        # Taxpayers whose total income stays inside the basic or higher rate
+        # band only ever fill the bands below it, so the band arithmetic is
+        # specialised on that position
+        thresholds = self.thresholds
+        if total_income <= thresholds.basic_rate_threshold:
+            tax = _dividend_tax_basic(taxable_dividends)
+        else:
+            basic_rate_remaining = thresholds.basic_rate_threshold - (total_income - dividend_income)
+            basic_rate_remaining = basic_rate_remaining if basic_rate_remaining > 0 else 0
+            if total_income <= thresholds.higher_rate_threshold:
+                tax = _dividend_tax_higher(taxable_dividends, basic_rate_remaining)
+            else:
+                higher_rate_limit = thresholds.higher_rate_threshold - thresholds.basic_rate_threshold
+                tax = _dividend_tax_additional(taxable_dividends, basic_rate_remaining, higher_rate_limit)
+        
+        return DividendTaxResult(
+            dividend_income=dividend_income,
+            dividend_allowance_used=dividend_allowance if dividend_allowance < dividend_income else dividend_income,
+            taxable_dividends=taxable_dividends,
+            dividend_tax=tax,
+            effective_dividend_rate=tax / dividend_income if dividend_income > 0 else 0
+        )
     
     def _calculate_personal_allowance(self, income: float, adjustment: float = 0) -> float:
         """Calculate personal allowance with high income taper"""
-        base_allowance = self.thresholds.personal_allowance + adjustment
-        
-        # Taper starts at £100,000
-        if income > 100000:
-            reduction = (income - 100000) * 0.5
-            return max(0, base_allowance - reduction)
-        
-        return base_allowance
+        return _personal_allowance(income, self.thresholds.personal_allowance + adjustment)
     
     def _calculate_tax_bands(self, taxable_income: float, 
                            basic_rate_limit: float, 
                            higher_rate_limit: float) -> Dict:
         """Calculate tax across different rate bands"""
-        bands = {
-            "basic_rate_tax": 0,
-            "higher_rate_tax": 0,
-            "additional_rate_tax": 0
-        }
-        
-        remaining_income = taxable_income
-        
-        # Basic rate band
-        basic_rate_income = min(remaining_income, basic_rate_limit)
-        bands["basic_rate_tax"] = basic_rate_income * self.thresholds.basic_rate
-        remaining_income -= basic_rate_income
-        
-        # Higher rate band
-        if remaining_income > 0:
-            higher_rate_income = min(remaining_income, higher_rate_limit - basic_rate_limit)
-            bands["higher_rate_tax"] = higher_rate_income * self.thresholds.higher_rate
-            remaining_income -= higher_rate_income
-        
-        # Additional rate band
-        if remaining_income > 0:
-            bands["additional_rate_tax"] = remaining_income * self.thresholds.additional_rate
+        thresholds = self.thresholds
+        basic_rate_tax, higher_rate_tax, additional_rate_tax = _tax_bands(
+            taxable_income, basic_rate_limit, higher_rate_limit,
+            thresholds.basic_rate, thresholds.higher_rate, thresholds.additional_rate
+        )
         
-        return bands
+        return {
+            "basic_rate_tax": basic_rate_tax,
+            "higher_rate_tax": higher_rate_tax,
+            "additional_rate_tax": additional_rate_tax
+        }
     
     def _calculate_marginal_rate(self, income: float) -> float:
         """Calculate marginal tax rate at given income level"""
-        if income <= self.thresholds.personal_allowance:
-            return 0.0
-        elif income <= self.thresholds.basic_rate_threshold:
-            return self.thresholds.basic_rate
-        elif income <= self.thresholds.higher_rate_threshold:
-            return self.thresholds.higher_rate
-        else:
-            return self.thresholds.additional_rate
+        # An income exactly on a band edge takes the rate of the band below
+        band_table = self.band_table
+        return band_table.rates[bisect_left(band_table.edges, income)]
 
-def calculate_comprehensive_tax_liability(income_data: Dict) -> Dict:
-    """Master function to calculate complete UK tax liability"""
+# The calculator holds no per-call state, so the master function reuses one
+DEFAULT_CALCULATOR = UKTaxCalculator()
+
+def calculate_comprehensive_tax_liability(income_data: Union[IncomeInputs, Dict], calculation_date: str = None) -> Dict:
+    """Master function to calculate complete UK tax liability
+    
+    income_data is an IncomeInputs, or a dict in the income data layout,
+    which is parsed once into IncomeInputs. Batch callers can pass one
+    calculation_date for every result in the batch instead of timestamping
+    each one.
+    """
     
-    calculator = UKTaxCalculator()
+    calculator = DEFAULT_CALCULATOR
     
-    # Extract income components
-    employment_income = income_data.get('employment_income', 0)
-    rental_income_data = income_data.get('rental_income', {})
-    investment_income = income_data.get('investment_income', {})
-    capital_gains = income_data.get('capital_gains', [])
+    # Parse the income data once at the boundary
+    inputs = income_data if isinstance(income_data, IncomeInputs) else IncomeInputs.from_dict(income_data)
+    employment_income = inputs.employment_income
+    rental = inputs.rental
     
     # Calculate rental income tax
     rental_tax_calc = calculator.calculate_rental_income_tax(
-        gross_rental_income=rental_income_data.get('gross_income', 0),
-        allowable_expenses=rental_income_data.get('expenses', 0),
-        mortgage_interest=rental_income_data.get('mortgage_interest', 0),
-        property_allowance_election=rental_income_data.get('property_allowance_election', False)
+        gross_rental_income=rental.gross_income,
+        allowable_expenses=rental.expenses,
+        mortgage_interest=rental.mortgage_interest,
+        property_allowance_election=rental.property_allowance_election
     )
     
+    # Earned and rental income is shared by the dividend and income tax bands
+    earned_plus_rental = employment_income + rental_tax_calc.taxable_rental_profit
+    
     # Calculate dividend tax
-    dividend_income = investment_income.get('dividends', 0)
-    total_income = employment_income + rental_tax_calc['taxable_rental_profit'] + dividend_income
+    dividend_income = inputs.dividends
+    total_income = earned_plus_rental + dividend_income
     
     dividend_tax_calc = calculator.calculate_dividend_tax(dividend_income, total_income)
     
     # Calculate main income tax
     income_tax_calc = calculator.calculate_income_tax(
-        gross_income=employment_income + rental_tax_calc['taxable_rental_profit'],
-        pension_contributions=income_data.get('pension_contributions', 0),
-        gift_aid_donations=income_data.get('gift_aid_donations', 0)
+        gross_income=earned_plus_rental,
+        pension_contributions=inputs.pension_contributions,
+        gift_aid_donations=inputs.gift_aid_donations
     )
     
     # Calculate National Insurance
     ni_calc = calculator.calculate_national_insurance(
         employment_income=employment_income,
-        self_employment_income=income_data.get('self_employment_income', 0)
+        self_employment_income=inputs.self_employment_income
     )
     
     # Calculate Capital Gains Tax
-    cgt_calc = calculator.calculate_capital_gains_tax(capital_gains)
+    cgt_calc = calculator.calculate_capital_gains_tax(inputs.capital_gains)
     
     # Compile total liability
     total_liability = {
-        "income_tax": income_tax_calc['total_tax'],
-        "dividend_tax": dividend_tax_calc['dividend_tax'],
-        "national_insurance": ni_calc['total_ni'],
-        "capital_gains_tax": cgt_calc['total_cgt'],
-        "mortgage_interest_relief": rental_tax_calc['mortgage_interest_relief']
+        "income_tax": income_tax_calc.total_tax,
+        "dividend_tax": dividend_tax_calc.dividend_tax,
+        "national_insurance": ni_calc.total_ni,
+        "capital_gains_tax": cgt_calc.total_cgt,
+        "mortgage_interest_relief": rental_tax_calc.mortgage_interest_relief
     }
     
-    net_total_tax = (total_liability["income_tax"] + 
-                    total_liability["dividend_tax"] + 
-                    total_liability["national_insurance"] + 
-                    total_liability["capital_gains_tax"] - 
-                    total_liability["mortgage_interest_relief"])
+    net_total_tax = (income_tax_calc.total_tax + 
+                    dividend_tax_calc.dividend_tax + 
+                    ni_calc.total_ni + 
+                    cgt_calc.total_cgt - 
+                    rental_tax_calc.mortgage_interest_relief)
     
     return {
-        "calculation_date": datetime.now().isoformat(),
+        "calculation_date": calculation_date or datetime.now().isoformat(),
         "tax_year": "2024/25",
         "income_breakdown": {
             "employment": employment_income,
@@ -4,18 +4,131 @@
 # Authored by: Sotiris Spyrou, CEO, VerityAI
 
 import json
+import operator
 from datetime import datetime
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Mapping, Sequence, Tuple, Union
+from dataclasses import dataclass, asdict
 
-@dataclass
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .uk_tax_calculations import result_field
+
+@dataclass(slots=True)
 class ValidationResult:
     """Result of data validation process"""
     is_valid: bool
-    errors: List[str]
-    warnings: List[str]
+    errors: Tuple[str, ...]
+    warnings: Tuple[str, ...]
     confidence_score: float
-    validation_notes: List[str]
+    validation_notes: Tuple[str, ...]
+    
+    def to_dict(self) -> Dict:
+        """Plain dict form of the result, for serialization"""
+        return asdict(self)
+
+@dataclass(frozen=True)
+class ValidationRule:
+    """A check applied to one field of a tax record, or one column of a batch
+    
+    threshold is a number, or the name of another column to compare against.
+    """
+    field: str
+    op: Callable
+    threshold: Union[float, str]
+    severity: str
+    message: str
+
+# Rental expenses above this multiple of gross rental income are flagged
+_RENTAL_EXPENSE_RATIO = 1.2
+
+# Validation checks, shared by single submission and batch validation and
+# listed in the order their messages are reported. Fields are the columns
+# built by batch_validation_columns plus the derived rental_expense_limit and
+# effective_tax_rate; a check whose field is absent does not apply
+VALIDATION_CHECKS = (
+    ValidationRule("employment_income", operator.lt, 0, "error",
+                   "Employment income cannot be negative"),
+    ValidationRule("employment_income", operator.gt, 1000000, "warning",
+                   "Employment income appears unusually high - please verify"),
+    ValidationRule("gross_rental_income", operator.lt, 0, "error",
+                   "Gross rental income cannot be negative"),
+    ValidationRule("rental_expenses", operator.gt, "rental_expense_limit", "warning",
+                   "Rental expenses appear high relative to income"),
+    ValidationRule("effective_tax_rate", operator.gt, 0.5, "warning",
+                   "Effective tax rate appears very high"),
+    ValidationRule("effective_tax_rate", operator.lt, 0, "error",
+                   "Effective tax rate cannot be negative"),
+    ValidationRule("income_tax_liability", operator.gt, 100000, "warning",
+                   "Income above £100k - Self Assessment filing required")
+)
+
+def _apply_checks(values: Mapping) -> Dict:
+    """Errors and warnings raised by the validation checks on one record's values"""
+    errors = []
+    warnings = []
+    for rule in VALIDATION_CHECKS:
+        if rule.field in values:
+            threshold = values[rule.threshold] if isinstance(rule.threshold, str) else rule.threshold
+            if rule.op(values[rule.field], threshold):
+                (errors if rule.severity == "error" else warnings).append(rule.message)
+    
+    return {"errors": errors, "warnings": warnings}
+
+@dataclass
+class BatchValidationResult:
+    """Result of validating a batch of tax records, one array entry per record"""
+    is_valid: np.ndarray
+    error_counts: np.ndarray
+    warning_counts: np.ndarray
+    confidence_scores: np.ndarray
+    violations: List[Tuple[ValidationRule, np.ndarray]]
+    
+    def row_result(self, row: int) -> ValidationResult:
+        """Materialize the validation result of a single record"""
+        errors = []
+        warnings = []
+        for rule, rows in self.violations:
+            position = np.searchsorted(rows, row)
+            if position < len(rows) and rows[position] == row:
+                (errors if rule.severity == "error" else warnings).append(rule.message)
+        
+        return ValidationResult(
+            is_valid=bool(self.is_valid[row]),
+            errors=tuple(errors),
+            warnings=tuple(warnings),
+            confidence_score=float(self.confidence_scores[row]),
+            validation_notes=()
+        )
+
+def batch_validation_columns(tax_result: Dict) -> Dict[str, np.ndarray]:
+    """Build validation columns from a calculate_comprehensive_tax_liability_vec result"""
+    income_breakdown = tax_result['income_breakdown']
+    rental = income_breakdown['rental']
+    income_tax = tax_result['tax_calculations']['income_tax']
+    
+    return {
+        "employment_income": income_breakdown['employment'],
+        "gross_rental_income": rental['gross_rental_income'],
+        "rental_expenses": rental['allowable_expenses'],
+        "income_tax_gross_income": income_tax['gross_income'],
+        "income_tax_total": income_tax['total_tax'],
+        "income_tax_liability": tax_result['total_liability']['income_tax']
+    }
+
+# Validation rules and HMRC thresholds are fixed, so they are built once and
+# shared read-only between validators
+_VALIDATION_RULES = MappingProxyType({
+    "income_limits": MappingProxyType({"employment_max": 10000000}),
+    "rate_limits": MappingProxyType({"effective_tax_rate_max": 0.50})
+})
+
+_HMRC_THRESHOLDS = MappingProxyType({"self_assessment_threshold": 100000})
 
 class DataValidator:
     """Comprehensive data validation for tax calculations"""
@@ -27,24 +140,19 @@ class DataValidator:
     def validate_complete_submission(self, tax_data: Dict) -> ValidationResult:
         """Validate complete tax submission data"""
         
-        errors = []
-        warnings = []
-        notes = []
-        
         # Validate income data
         income_validation = self._validate_income_data(tax_data.get('income_breakdown', {}))
-        errors.extend(income_validation['errors'])
-        warnings.extend(income_validation['warnings'])
         
         # Validate tax calculations
         calculation_validation = self._validate_tax_calculations(tax_data.get('tax_calculations', {}))
-        errors.extend(calculation_validation['errors'])
-        warnings.extend(calculation_validation['warnings'])
         
         # Validate HMRC compliance
         compliance_validation = self._validate_hmrc_compliance(tax_data)
-        errors.extend(compliance_validation['errors'])
-        warnings.extend(compliance_validation['warnings'])
+        
+        errors = (*income_validation['errors'], *calculation_validation['errors'],
+                  *compliance_validation['errors'])
+        warnings = (*income_validation['warnings'], *calculation_validation['warnings'],
+                    *compliance_validation['warnings'])
         
         # Calculate overall confidence score
         confidence_score = self._calculate_confidence_score(errors, warnings, tax_data)
@@ -54,71 +162,85 @@ class DataValidator:
             errors=errors,
             warnings=warnings,
             confidence_score=confidence_score,
-            validation_notes=notes
+            validation_notes=()
+        )
+    
+    def validate_batch(self, records) -> BatchValidationResult:
+        """Validate a batch of tax records in one pass per rule
+        
+        records is a mapping of column name to array (see
+        batch_validation_columns) or a structured array with those fields.
+        """
+        
+        # Derived columns: the rental expense limit, and the effective rate,
+        # left as NaN where there is no income so no rate rule can fire
+        gross_income = np.asarray(records["income_tax_gross_income"], dtype=np.float64)
+        columns = {
+            "rental_expense_limit": np.asarray(records["gross_rental_income"], dtype=np.float64) * _RENTAL_EXPENSE_RATIO,
+            "effective_tax_rate": np.divide(
+                np.asarray(records["income_tax_total"], dtype=np.float64), gross_income,
+                out=np.full_like(gross_income, np.nan), where=gross_income > 0
+            )
+        }
+        
+        error_counts = np.zeros(len(gross_income), dtype=np.int64)
+        warning_counts = np.zeros(len(gross_income), dtype=np.int64)
+        violations = []
+        
+        for rule in VALIDATION_CHECKS:
+            values = columns[rule.field] if rule.field in columns else records[rule.field]
+            threshold = columns[rule.threshold] if isinstance(rule.threshold, str) else rule.threshold
+            mask = rule.op(values, threshold)
+            if rule.severity == "error":
+                error_counts += mask
+            else:
+                warning_counts += mask
+            rows = np.flatnonzero(mask)
+            if len(rows):
+                violations.append((rule, rows))
+        
+        # Same scoring as _calculate_confidence_score
+        confidence_scores = np.clip(1.0 - error_counts * 0.2 - warning_counts * 0.05, 0.0, 1.0)
+        
+        return BatchValidationResult(
+            is_valid=error_counts == 0,
+            error_counts=error_counts,
+            warning_counts=warning_counts,
+            confidence_scores=confidence_scores,
+            violations=violations
         )
     
     def _validate_income_data(self, income_data: Dict) -> Dict:
         """Validate income data for completeness and accuracy"""
         
-        errors = []
-        warnings = []
+        rental_data = income_data.get('rental')
+        gross_rental = result_field(rental_data, 'gross_rental_income')
         
-        # Check employment income
-        employment = income_data.get('employment', 0)
-        if employment < 0:
-            errors.append("Employment income cannot be negative")
-        elif employment > 1000000:
-            warnings.append("Employment income appears unusually high - please verify")
-        
-        # Check rental income
-        rental_data = income_data.get('rental', {})
-        if isinstance(rental_data, dict):
-            gross_rental = rental_data.get('gross_rental_income', 0)
-            expenses = rental_data.get('allowable_expenses', 0)
-            
-            if gross_rental < 0:
-                errors.append("Gross rental income cannot be negative")
-            
-            if expenses > gross_rental * 1.2:
-                warnings.append("Rental expenses appear high relative to income")
-        
-        return {"errors": errors, "warnings": warnings}
+        return _apply_checks({
+            "employment_income": income_data.get('employment', 0),
+            "gross_rental_income": gross_rental,
+            "rental_expenses": result_field(rental_data, 'allowable_expenses'),
+            "rental_expense_limit": gross_rental * _RENTAL_EXPENSE_RATIO
+        })
     
     def _validate_tax_calculations(self, tax_calculations: Dict) -> Dict:
         """Validate tax calculation accuracy"""
         
-        errors = []
-        warnings = []
+        # The effective rate is only checked where there is income
+        income_tax_calc = tax_calculations.get('income_tax')
+        gross_income = result_field(income_tax_calc, 'gross_income')
+        if gross_income <= 0:
+            return {"errors": [], "warnings": []}
         
-        # Validate income tax calculation
-        income_tax_calc = tax_calculations.get('income_tax', {})
-        if income_tax_calc:
-            gross_income = income_tax_calc.get('gross_income', 0)
-            total_tax = income_tax_calc.get('total_tax', 0)
-            
-            if gross_income > 0:
-                effective_rate = total_tax / gross_income
-                if effective_rate > 0.5:
-                    warnings.append("Effective tax rate appears very high")
-                elif effective_rate < 0:
-                    errors.append("Effective tax rate cannot be negative")
-        
-        return {"errors": errors, "warnings": warnings}
+        return _apply_checks({"effective_tax_rate": result_field(income_tax_calc, 'total_tax') / gross_income})
     
     def _validate_hmrc_compliance(self, tax_data: Dict) -> Dict:
         """Validate HMRC compliance requirements"""
         
-        errors = []
-        warnings = []
-        
         # Check if Self Assessment required
-        total_income = tax_data.get('total_liability', {}).get('income_tax', 0)
-        if total_income > 100000:
-            warnings.append("Income above £100k - Self Assessment filing required")
-        
-        return {"errors": errors, "warnings": warnings}
+        return _apply_checks({"income_tax_liability": tax_data.get('total_liability', {}).get('income_tax', 0)})
     
-    def _calculate_confidence_score(self, errors: List, warnings: List, tax_data: Dict) -> float:
+    def _calculate_confidence_score(self, errors: Sequence, warnings: Sequence, tax_data: Dict) -> float:
         """Calculate overall confidence score for validation"""
         
         base_score = 1.0
@@ -127,16 +249,31 @@ class DataValidator:
         
         return max(0.0, min(1.0, base_score))
     
-    def _load_validation_rules(self) -> Dict:
+    def _load_validation_rules(self) -> Mapping:
         """Load validation rules for tax data"""
-        return {
-            "income_limits": {"employment_max": 10000000},
-            "rate_limits": {"effective_tax_rate_max": 0.50}
-        }
+        return _VALIDATION_RULES
     
-    def _load_hmrc_thresholds(self) -> Dict:
+    def _load_hmrc_thresholds(self) -> Mapping:
         """Load current HMRC thresholds for validation"""
-        return {"self_assessment_threshold": 100000}
+        return _HMRC_THRESHOLDS
+
+# The validator holds no per-call state, so the workflow reuses one
+DEFAULT_VALIDATOR = DataValidator()
+
+# Keys of the formatted outputs in a report package, by requested format
+_FORMATTED_OUTPUT_KEYS = {"json": "json_export", "text": "text_summary"}
+
+# json.dumps builds a new encoder on every call when given options, so the
+# fallback path keeps one configured encoder
+_REPORT_ENCODER = json.JSONEncoder(indent=2, default=str)
+
+def _dumps_report(report_data: Dict) -> str:
+    """Serialize report data as indented JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(
+            report_data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return _REPORT_ENCODER.encode(report_data)
 
 class ReportGenerator:
     """Generate comprehensive tax reports"""
@@ -144,8 +281,31 @@ class ReportGenerator:
     def __init__(self):
         self.templates = {}
     
-    def generate_complete_tax_report(self, tax_data: Dict, validation_result: ValidationResult) -> Dict:
-        """Generate complete tax liability report"""
+    def generate_complete_tax_report(self, tax_data: Dict, validation_result: ValidationResult,
+                                     formats: Sequence[str] = (), generated_date: str = None) -> Dict:
+        """Generate complete tax liability report
+        
+        Formatted outputs are only built for the formats requested ('json',
+        'text'); the structured report data is always returned.
+        """
+        
+        report_data = self.generate_report_data(tax_data, validation_result, generated_date)
+        
+        report_package = {"report_data": report_data}
+        if formats:
+            report_package["formatted_outputs"] = {
+                _FORMATTED_OUTPUT_KEYS.get(fmt, fmt): self.format_report(report_data, fmt) for fmt in formats
+            }
+        
+        return report_package
+    
+    def generate_report_data(self, tax_data: Dict, validation_result: ValidationResult,
+                             generated_date: str = None) -> Dict:
+        """Generate the structured report data
+        
+        Batch callers can pass one generated_date for every report in the
+        batch instead of timestamping each one.
+        """
         
         # Generate executive summary
         executive_summary = self._generate_executive_summary(tax_data)
@@ -157,9 +317,9 @@ class ReportGenerator:
         # Generate next steps
         next_steps = self._generate_next_steps(tax_data, validation_result)
         
-        report_data = {
+        return {
             "report_metadata": {
-                "generated_date": datetime.now().isoformat(),
+                "generated_date": generated_date or datetime.now().isoformat(),
                 "tax_year": "2024/25",
                 "report_type": "Tax Liability Analysis",
                 "validation_status": "Validated" if validation_result.is_valid else "Requires Review"
@@ -168,22 +328,20 @@ class ReportGenerator:
             "income_breakdown": income_breakdown,
             "tax_breakdown": tax_breakdown,
             "next_steps": next_steps,
-            "validation_notes": validation_result.validation_notes,
-            "warnings": validation_result.warnings,
-            "errors": validation_result.errors
-        }
-        
-        # Generate formatted outputs
-        formatted_outputs = {
-            "json_export": json.dumps(report_data, indent=2, default=str),
-            "text_summary": self._generate_text_summary(report_data)
-        }
-        
-        return {
-            "report_data": report_data,
-            "formatted_outputs": formatted_outputs
+            "validation_notes": list(validation_result.validation_notes),
+            "warnings": list(validation_result.warnings),
+            "errors": list(validation_result.errors)
         }
     
+    def format_report(self, report_data: Dict, fmt: str = 'json') -> str:
+        """Format report data as a JSON export ('json') or text summary ('text')"""
+        
+        if fmt == 'json':
+            return _dumps_report(report_data)
+        if fmt == 'text':
+            return self._generate_text_summary(report_data)
+        raise ValueError(f"Unsupported report format: {fmt}")
+    
     def _generate_executive_summary(self, tax_data: Dict) -> Dict:
         """Generate executive summary of tax position"""
         
@@ -219,11 +377,11 @@ class ReportGenerator:
         
         breakdown = {}
         
-        income_tax = tax_calculations.get('income_tax', {})
+        income_tax = tax_calculations.get('income_tax')
         if income_tax:
             breakdown['income_tax'] = {
-                "taxable_income": income_tax.get('taxable_income', 0),
-                "total_income_tax": income_tax.get('total_tax', 0)
+                "taxable_income": result_field(income_tax, 'taxable_income'),
+                "total_income_tax": result_field(income_tax, 'total_tax')
             }
         
         return breakdown
@@ -264,21 +422,26 @@ NEXT STEPS:
         return summary
 
 # Main workflow function
-def run_complete_validation_and_reporting(tax_calculation_result: Dict, anthropic_api_key: str = None) -> Dict:
-    """Complete validation and reporting workflow"""
+def run_complete_validation_and_reporting(tax_calculation_result: Dict, anthropic_api_key: str = None,
+                                          formats: Sequence[str] = (), generated_date: str = None) -> Dict:
+    """Complete validation and reporting workflow
+    
+    The validation result is returned as a ValidationResult; callers that
+    need a plain dict can use its to_dict().
+    """
     
     # Run validation
-    validator = DataValidator()
+    validator = DEFAULT_VALIDATOR
     validation_result = validator.validate_complete_submission(tax_calculation_result)
     
     # Generate reports
     report_generator = ReportGenerator()
     report_package = report_generator.generate_complete_tax_report(
-        tax_calculation_result, validation_result
+        tax_calculation_result, validation_result, formats, generated_date
     )
     
     return {
-        "validation_result": validation_result.__dict__,
+        "validation_result": validation_result,
         "report_package": report_package,
         "processing_summary": {
             "validation_passed": validation_result.is_valid,
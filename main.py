@@ -5,35 +5,50 @@
 # Authored by: Sotiris Spyrou, CEO, VerityAI
 
 import os
+import re
+import stat
 import sys
 import json
-from datetime import datetime
+import time
 from typing import Dict, List, Optional
 import argparse
+import importlib
+from dataclasses import fields, is_dataclass
+from enum import Enum
 
-# Add functions directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'functions'))
-
-# Import core modules
 try:
-    from uk_tax_calculations import calculate_comprehensive_tax_liability
-    from document_processing_tools import DocumentProcessor, batch_process_documents
-    from validation_reporting_functions import run_complete_validation_and_reporting
-    from optimization_engine_functions import generate_comprehensive_optimization_plan
-except ImportError as e:
-    print(f"❌ Error importing modules: {e}")
-    print("💡 Ensure all dependencies are installed: pip install -r requirements.txt")
-    sys.exit(1)
+    import orjson
+except ImportError:
+    orjson = None
+
+def _safe_import(name: str):
+    """Import a core module where it is first needed, exiting with a hint if it fails
+    
+    Core modules are imported lazily so paths that do not use them (--help,
+    manual input without documents) skip their import cost.
+    """
+    try:
+        return importlib.import_module(f'functions.{name}')
+    except ImportError as e:
+        print(f"❌ Error importing modules: {e}")
+        print("💡 Ensure all dependencies are installed: pip install -r requirements.txt")
+        sys.exit(1)
+
+# KEY=value assignments in a .env file; blank lines, comments and other
+# lines are skipped, and whitespace around the key and value is dropped
+_ENV_ASSIGNMENT = re.compile(r'^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$', re.MULTILINE)
+
+# Claude API key, resolved once by load_environment
+API_KEY = None
 
 def load_environment():
     """Load environment variables from .env file"""
+    global API_KEY
+    
     env_file = '.env'
     if os.path.exists(env_file):
         with open(env_file, 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    os.environ[key] = value
+            os.environ.update(_ENV_ASSIGNMENT.findall(f.read()))
     
     # Check for required API key
     if not os.getenv('CLAUDE_API_KEY'):
@@ -41,6 +56,37 @@ def load_environment():
         print("💡 Please create a .env file with your Claude API key")
         print("📝 Copy .env.example to .env and add your API key")
         sys.exit(1)
+    
+    API_KEY = os.environ['CLAUDE_API_KEY']
+
+def _json_default(obj):
+    """Serialize results by their dict form, enums by value, anything else as a string"""
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+def _write_json(path: str, payload: Dict):
+    """Write payload as indented JSON, using orjson when available"""
+    if orjson is not None:
+        data = memoryview(orjson.dumps(
+            payload, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ))
+        # The document is already encoded, so it goes to a raw descriptor
+        # without the buffered file object in between
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        return
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, default=_json_default)
 
 def interactive_mode():
     """Run interactive tax optimization workflow"""
@@ -55,7 +101,15 @@ def interactive_mode():
         file_path = input("Enter document file path (or 'done' to continue): ").strip()
         if file_path.lower() == 'done':
             break
-        if file_path and os.path.exists(file_path):
+        if _is_piped_json(file_path):
+            return _process_piped_income_data(file_path)
+        # One stat both checks the path and rejects directories, which the
+        # document reader would otherwise only fail on during processing
+        try:
+            is_file = bool(file_path) and stat.S_ISREG(os.stat(file_path).st_mode)
+        except OSError:
+            is_file = False
+        if is_file:
             document_files.append(file_path)
             print(f"✅ Added: {file_path}")
         else:
@@ -68,11 +122,7 @@ def interactive_mode():
     # Process documents
     print(f"\n🔄 Processing {len(document_files)} documents...")
     try:
-        api_key = os.getenv('CLAUDE_API_KEY')
-        results = batch_process_documents(document_files, api_key)
-        
-        # Extract and consolidate data
-        income_data = consolidate_extracted_data(results)
+        income_data = process_documents(document_files)
         print("✅ Document processing complete")
         
     except Exception as e:
@@ -82,8 +132,85 @@ def interactive_mode():
     # Step 2: Tax Calculation
     return process_tax_calculation(income_data)
 
+# Types of the income data fields read as JSON, in the income data layout;
+# fields not listed here are passed through unchanged
+FIELDS = {
+    'employment_income': float,
+    'rental_income': {'gross_income': float, 'expenses': float, 'mortgage_interest': float},
+    'investment_income': {'dividends': float},
+    'pension_contributions': float,
+    'gift_aid_donations': float
+}
+
+def _coerce_fields(data: Dict, schema: Dict) -> Dict:
+    """Convert the fields of data named in schema to their schema types"""
+    coerced = dict(data)
+    for name, field_type in schema.items():
+        if name in coerced:
+            value = coerced[name]
+            if not isinstance(field_type, dict):
+                coerced[name] = field_type(value)
+            elif isinstance(value, dict):
+                coerced[name] = _coerce_fields(value, field_type)
+            else:
+                raise TypeError(f"{name} must be an object of {', '.join(field_type)}")
+    return coerced
+
+def _is_piped_json(line: str) -> bool:
+    """Whether an answer read from piped stdin opens a JSON document"""
+    return line.startswith('{') and not sys.stdin.isatty()
+
+def _read_stdin_income_data(first_line: str) -> Optional[Dict]:
+    """Parse income data piped to stdin as one JSON document starting on first_line
+    
+    Returns None, after reporting why, if the document is not valid JSON
+    income data.
+    """
+    data = first_line + sys.stdin.read()
+    try:
+        income_data = orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError as e:  # orjson.JSONDecodeError is a ValueError too
+        print(f"❌ Invalid JSON income data: {e}")
+        return None
+    
+    if not isinstance(income_data, dict):
+        print("❌ Income data must be a JSON object of income fields")
+        return None
+    
+    try:
+        return _coerce_fields(income_data, FIELDS)
+    except (TypeError, ValueError) as e:
+        print(f"❌ Invalid income data: {e}")
+        return None
+
+def _process_piped_income_data(first_line: str):
+    """Run the tax calculation on income data piped to stdin as JSON"""
+    income_data = _read_stdin_income_data(first_line)
+    if income_data is not None:
+        return process_tax_calculation(income_data)
+
+def _input_amount(prompt: str, answer: Optional[str] = None) -> Optional[float]:
+    """Amount entered at prompt, asked again until it is a number; None if left blank
+    
+    answer is an answer already read for the prompt, if any.
+    """
+    while True:
+        if answer is None:
+            answer = input(prompt).strip()
+        if not answer:
+            return None
+        try:
+            return float(answer)
+        except ValueError:
+            print(f"❌ '{answer}' is not an amount. Please enter a number, e.g. 52345.67")
+            answer = None
+
 def manual_input_mode():
-    """Manual data input mode"""
+    """Manual data input mode
+    
+    When stdin is piped, the answers may instead be one JSON document in
+    the income data layout, starting on the first line.
+    """
     print("\n✏️  Manual Input Mode")
     print("Please enter your tax information:")
     
@@ -91,76 +218,101 @@ def manual_input_mode():
     
     # Employment income
     employment = input("Employment income (£): ").strip()
-    if employment:
-        income_data['employment_income'] = float(employment)
+    if _is_piped_json(employment):
+        return _process_piped_income_data(employment)
+    employment = _input_amount("Employment income (£): ", employment)
+    if employment is not None:
+        income_data['employment_income'] = employment
     
     # Rental income
-    rental_income = input("Gross rental income (£, optional): ").strip()
-    if rental_income:
-        rental_expenses = input("Rental expenses (£): ").strip() or "0"
-        mortgage_interest = input("Mortgage interest (£): ").strip() or "0"
+    rental_income = _input_amount("Gross rental income (£, optional): ")
+    if rental_income is not None:
+        rental_expenses = _input_amount("Rental expenses (£): ")
+        mortgage_interest = _input_amount("Mortgage interest (£): ")
         
         income_data['rental_income'] = {
-            'gross_income': float(rental_income),
-            'expenses': float(rental_expenses),
-            'mortgage_interest': float(mortgage_interest)
+            'gross_income': rental_income,
+            'expenses': rental_expenses or 0.0,
+            'mortgage_interest': mortgage_interest or 0.0
         }
     
     # Investment income
-    dividends = input("Dividend income (£, optional): ").strip()
-    if dividends:
+    dividends = _input_amount("Dividend income (£, optional): ")
+    if dividends is not None:
         income_data['investment_income'] = {
-            'dividends': float(dividends)
+            'dividends': dividends
         }
     
     # Deductions
-    pension = input("Pension contributions (£, optional): ").strip()
-    if pension:
-        income_data['pension_contributions'] = float(pension)
+    pension = _input_amount("Pension contributions (£, optional): ")
+    if pension is not None:
+        income_data['pension_contributions'] = pension
     
-    gift_aid = input("Gift Aid donations (£, optional): ").strip()
-    if gift_aid:
-        income_data['gift_aid_donations'] = float(gift_aid)
+    gift_aid = _input_amount("Gift Aid donations (£, optional): ")
+    if gift_aid is not None:
+        income_data['gift_aid_donations'] = gift_aid
     
     return process_tax_calculation(income_data)
 
+def process_documents(file_paths: List[str]) -> Dict:
+    """Extract every document and consolidate the results into income data
+    
+    Documents are extracted locally and batch_process_documents already
+    spreads them over worker processes, so the whole batch is submitted
+    in one call. Consolidation does not read the raw text preview, so it
+    is not built.
+    """
+    document_processing_tools = _safe_import('document_processing_tools')
+    results = document_processing_tools.batch_process_documents(file_paths, API_KEY, include_raw_text=False)
+    return consolidate_extracted_data(results)
+
 def consolidate_extracted_data(extraction_results: Dict) -> Dict:
     """Consolidate data from multiple document extractions"""
-    income_data = {
-        'employment_income': 0,
-        'rental_income': {'gross_income': 0, 'expenses': 0, 'mortgage_interest': 0},
-        'investment_income': {'dividends': 0},
-        'pension_contributions': 0,
-        'gift_aid_donations': 0,
-        'capital_gains': []
-    }
     
+    # Totals are accumulated in locals and the nested income data is built
+    # once at the end, instead of indexing into it for every line item
+    employment_income = 0
+    rental_gross_income = 0
+    rental_expenses = 0
+    dividends = 0
+    pension_contributions = 0
+    
+    # Report and drop failed extractions before accumulating
     for file_path, result in extraction_results.items():
         if 'error' in result:
             print(f"⚠️  Skipping {file_path}: {result['error']}")
-            continue
-        
-        extracted_data = result.get('extracted_data', {})
-        
+    extractions = [
+        result.get('extracted_data', {}) for result in extraction_results.values() if 'error' not in result
+    ]
+    
+    for extracted_data in extractions:
         # Consolidate income streams
         for income in extracted_data.get('income_streams', []):
-            if income['type'] == 'Employment':
-                income_data['employment_income'] += income.get('amount', 0)
-            elif income['type'] == 'Rental':
-                income_data['rental_income']['gross_income'] += income.get('amount', 0)
-            elif income['type'] == 'Investment':
-                income_data['investment_income']['dividends'] += income.get('amount', 0)
+            income_type = income['type']
+            if income_type == 'Employment':
+                employment_income += income.get('amount', 0)
+            elif income_type == 'Rental':
+                rental_gross_income += income.get('amount', 0)
+            elif income_type == 'Investment':
+                dividends += income.get('amount', 0)
         
         # Consolidate expenses
         for expense in extracted_data.get('expenses', []):
             if expense.get('category') == 'Property':
-                income_data['rental_income']['expenses'] += expense.get('amount', 0)
+                rental_expenses += expense.get('amount', 0)
         
         # Consolidate tax deductions
         tax_deductions = extracted_data.get('tax_deductions', {})
-        income_data['pension_contributions'] += tax_deductions.get('pension_contributions', 0)
+        pension_contributions += tax_deductions.get('pension_contributions', 0)
     
-    return income_data
+    return {
+        'employment_income': employment_income,
+        'rental_income': {'gross_income': rental_gross_income, 'expenses': rental_expenses, 'mortgage_interest': 0},
+        'investment_income': {'dividends': dividends},
+        'pension_contributions': pension_contributions,
+        'gift_aid_donations': 0,
+        'capital_gains': []
+    }
 
 def process_tax_calculation(income_data: Dict):
     """Process tax calculations and generate reports"""
@@ -168,7 +320,8 @@ def process_tax_calculation(income_data: Dict):
     
     try:
         # Calculate comprehensive tax liability
-        tax_result = calculate_comprehensive_tax_liability(income_data)
+        uk_tax_calculations = _safe_import('uk_tax_calculations')
+        tax_result = uk_tax_calculations.calculate_comprehensive_tax_liability(income_data)
         print("✅ Tax calculations complete")
         
         # Display summary
@@ -187,8 +340,8 @@ def process_tax_calculation(income_data: Dict):
     print("\n✅ Step 3: Validation and Reporting")
     
     try:
-        api_key = os.getenv('CLAUDE_API_KEY')
-        validation_report = run_complete_validation_and_reporting(tax_result, api_key)
+        validation_reporting_functions = _safe_import('validation_reporting_functions')
+        validation_report = validation_reporting_functions.run_complete_validation_and_reporting(tax_result, API_KEY)
         
         if validation_report['processing_summary']['validation_passed']:
             print("✅ All validations passed")
@@ -204,7 +357,8 @@ def process_tax_calculation(income_data: Dict):
     print("\n🎯 Step 4: Optimization Analysis")
     
     try:
-        optimization_plan = generate_comprehensive_optimization_plan(tax_result)
+        optimization_engine_functions = _safe_import('optimization_engine_functions')
+        optimization_plan = optimization_engine_functions.generate_comprehensive_optimization_plan(tax_result)
         
         summary = optimization_plan.get('summary', {})
         potential_savings = summary.get('potential_savings', 0)
@@ -221,19 +375,20 @@ def process_tax_calculation(income_data: Dict):
     # Step 5: Generate Reports
     print("\n📋 Step 5: Generate Reports")
     
+    # Created on every save: the directory may be removed while the program
+    # runs, and the call costs a few microseconds when it already exists
     output_dir = "reports"
     os.makedirs(output_dir, exist_ok=True)
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     
     # Save JSON results
     json_file = f"{output_dir}/tax_analysis_{timestamp}.json"
-    with open(json_file, 'w') as f:
-        json.dump({
-            'tax_calculation': tax_result,
-            'validation_report': validation_report,
-            'optimization_plan': optimization_plan
-        }, f, indent=2, default=str)
+    _write_json(json_file, {
+        'tax_calculation': tax_result,
+        'validation_report': validation_report,
+        'optimization_plan': optimization_plan
+    })
     
     print(f"💾 Detailed results saved to: {json_file}")
     
@@ -257,9 +412,7 @@ def cli_mode(args):
     if args.files:
         print(f"🔄 Processing {len(args.files)} files...")
         try:
-            api_key = os.getenv('CLAUDE_API_KEY')
-            results = batch_process_documents(args.files, api_key)
-            income_data = consolidate_extracted_data(results)
+            income_data = process_documents(args.files)
             process_tax_calculation(income_data)
         except Exception as e:
             print(f"❌ CLI processing failed: {e}")
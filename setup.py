@@ -0,0 +1,25 @@
+# //setup.py
+# [Version 15-10-2026 09:00:00]
+# Build Script for the Compiled Tax Kernels of TaxOptim AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+# Builds the optional Cython kernels next to the Python modules:
+#
+#     pip install cython
+#     python setup.py build_ext --inplace
+#
+# Without Cython the package builds without the extension, and
+# functions/uk_tax_calculations.py uses its Python kernels.
+
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+setup(
+    name="taxoptim-ai",
+    packages=["functions"],
+    ext_modules=cythonize("functions/uk_tax_calculations_cy.pyx") if cythonize is not None else []
+)
@@ -3,55 +3,109 @@
 # Basic Test Suite for Tax Optimization AI
 # Authored by: Sotiris Spyrou, CEO, VerityAI
 
-import sys
-import os
 import unittest
 
-# Add functions directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'functions'))
+from functions.uk_tax_calculations import UKTaxCalculator, IncomeInputs, calculate_comprehensive_tax_liability, _coerce_gains
 
-from uk_tax_calculations import UKTaxCalculator, calculate_comprehensive_tax_liability
+# (gross income, personal allowance, taxable income), across the allowance taper
+CASES = [
+    (50000, 12570, 37430),
+    (100000, 12570, 87430),
+    (110000, 7570, 102430),
+    (130000, 0, 130000)
+]
 
 class TestTaxCalculations(unittest.TestCase):
     """Test UK tax calculation functions"""
     
-    def setUp(self):
-        self.calculator = UKTaxCalculator()
+    @classmethod
+    def setUpClass(cls):
+        # The calculator holds no per-call state, so every test shares one
+        cls.calculator = UKTaxCalculator()
     
     def test_basic_income_tax(self):
         """Test basic income tax calculation"""
-        result = self.calculator.calculate_income_tax(50000)
-        
-        # Should have personal allowance
-        self.assertEqual(result['personal_allowance'], 12570)
-        
-        # Should have taxable income
-        self.assertEqual(result['taxable_income'], 37430)
-        
-        # Should have basic rate tax
-        self.assertGreater(result['total_tax'], 0)
+        for income, personal_allowance, taxable_income in CASES:
+            with self.subTest(income=income):
+                result = self.calculator.calculate_income_tax(income)
+                
+                # Should have personal allowance
+                self.assertEqual(result.personal_allowance, personal_allowance)
+                
+                # Should have taxable income
+                self.assertEqual(result.taxable_income, taxable_income)
+                
+                # Should have basic rate tax
+                self.assertGreater(result.total_tax, 0)
     
     def test_national_insurance(self):
         """Test National Insurance calculation"""
-        result = self.calculator.calculate_national_insurance(50000)
+        for income, _, _ in CASES:
+            with self.subTest(income=income):
+                result = self.calculator.calculate_national_insurance(income)
+                
+                self.assertEqual(result.employment_income, income)
+                self.assertGreater(result.class1_employee, 0)
+                self.assertEqual(result.total_ni, result.class1_employee)
+    
+    def test_capital_gains_arrays(self):
+        """Test array-based CGT matches the list of disposals"""
+        disposals = [
+            {'type': 'property', 'amount': 20000},
+            {'type': 'shares', 'amount': 5000},
+            {'type': 'shares', 'amount': -2000}
+        ]
+        expected = self.calculator.calculate_capital_gains_tax(disposals)
+        
+        amounts, type_codes = _coerce_gains(disposals)
+        result = self.calculator.calculate_capital_gains_tax(amounts, type_codes=type_codes)
         
-        self.assertEqual(result['employment_income'], 50000)
-        self.assertGreater(result['class1_employee'], 0)
-        self.assertEqual(result['total_ni'], result['class1_employee'])
+        self.assertEqual(result, expected)
+        self.assertEqual(result.total_losses, 2000)
     
     def test_comprehensive_calculation(self):
         """Test comprehensive tax liability calculation"""
+        for income, _, _ in CASES:
+            with self.subTest(income=income):
+                income_data = {
+                    'employment_income': income,
+                    'pension_contributions': 5000
+                }
+                
+                result = calculate_comprehensive_tax_liability(income_data)
+                
+                self.assertIn('tax_year', result)
+                self.assertEqual(result['tax_year'], '2024/25')
+                self.assertIn('net_total_tax', result)
+                self.assertGreater(result['net_total_tax'], 0)
+    
+    def test_typed_income_inputs(self):
+        """Test typed inputs give the same liability as the income data dict"""
         income_data = {
-            'employment_income': 50000,
-            'pension_contributions': 5000
+            'employment_income': 60000,
+            'rental_income': {'gross_income': 12000, 'expenses': 3000, 'mortgage_interest': 1000},
+            'investment_income': {'dividends': 4000}
         }
         
-        result = calculate_comprehensive_tax_liability(income_data)
+        inputs = IncomeInputs.from_dict(income_data)
+        expected = calculate_comprehensive_tax_liability(income_data, calculation_date='2025-01-31')
+        result = calculate_comprehensive_tax_liability(inputs, calculation_date='2025-01-31')
+        
+        self.assertEqual(inputs.rental.mortgage_interest, 1000)
+        self.assertEqual(result, expected)
+    
+    def test_results_are_not_shared(self):
+        """Test equal inputs give equal results that do not share mutable state"""
+        income_data = {'employment_income': 60000, 'investment_income': {'dividends': 4000}}
+        
+        first = calculate_comprehensive_tax_liability(income_data)
+        second = calculate_comprehensive_tax_liability(income_data)
+        self.assertEqual(first['net_total_tax'], second['net_total_tax'])
         
-        self.assertIn('tax_year', result)
-        self.assertEqual(result['tax_year'], '2024/25')
-        self.assertIn('net_total_tax', result)
-        self.assertGreater(result['net_total_tax'], 0)
+        first['tax_calculations']['income_tax'].tax_bands['basic_rate_tax'] = 0
+        first['total_liability']['income_tax'] = 0
+        self.assertGreater(second['tax_calculations']['income_tax'].tax_bands['basic_rate_tax'], 0)
+        self.assertGreater(second['total_liability']['income_tax'], 0)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,149 @@
+# //tests/test_document_processing.py
+# [Version 15-10-2026 09:00:00]
+# Document Processing Test Suite for Tax Optimization AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from functions.document_processing_tools import DocumentProcessor, batch_process_documents
+
+P60_TEXT = """P60 End of Year Certificate
+Employer: Acme Widgets Ltd
+Employee NI number AB123456C
+Tax code 1257L
+Total pay in this employment £52,345.67
+Income tax deducted £8,123.40
+National Insurance contributions £3,210.00
+Pension contributions £2,500.00
+"""
+
+STATEMENT_TEXT = """Bank Statement - Current Account
+01/04/2024 Salary Payment ACME £3,500.00
+03/04/2024 Boiler repair £250.00
+05/04/2024 Dividend Income £120.50
+07/04/2024 Coffee Shop £3.20
+10/04/2024 Professional fees £400.00
+"""
+
+class TestDocumentProcessing(unittest.TestCase):
+    """Test document extraction functions"""
+
+    def setUp(self):
+        self.processor = DocumentProcessor()
+
+    def test_p60_extraction(self):
+        """Test P60 key figures are extracted"""
+        result = self.processor._process_p60(P60_TEXT)
+
+        self.assertEqual(result.income_streams[0]['amount'], 52345.67)
+        self.assertEqual(result.tax_deductions['income_tax'], 8123.40)
+        self.assertEqual(result.tax_deductions['national_insurance'], 3210.00)
+        self.assertEqual(result.tax_deductions['pension_contributions'], 2500.00)
+        self.assertEqual(result.personal_details['nino'], 'AB123456C')
+        self.assertEqual(result.personal_details['tax_code'], '1257L')
+        self.assertEqual(result.validation_flags, [])
+
+    def test_p60_identifiers(self):
+        """Test NINO and tax code are found in awkward layouts"""
+        text = "Tax code not shown\nNI: xqab123456c\nTAX CODE: K475 (cumulative)\n"
+        result = self.processor._process_p60(text)
+
+        self.assertEqual(result.personal_details['nino'], 'ab123456c')
+        self.assertEqual(result.personal_details['tax_code'], '475')
+
+    def test_bank_statement_categorisation(self):
+        """Test bank statement transactions are categorised"""
+        result = self.processor._process_bank_statement(STATEMENT_TEXT)
+
+        income = [(i['type'], i['amount']) for i in result.income_streams]
+        expenses = [(e['category'], e['amount']) for e in result.expenses]
+
+        self.assertEqual(income, [('Employment', 3500.00), ('Investment', 120.50)])
+        self.assertEqual(expenses, [('Property', 250.00), ('Business', 400.00)])
+
+    def test_bank_statement_transactions_stay_on_one_line(self):
+        """Test a transaction description never spans a line break"""
+        text = "01/04/2024\nSalary Payment £3,500.00\n"
+        result = self.processor._process_bank_statement(text)
+
+        self.assertEqual(result.income_streams, [])
+
+    def test_bank_statement_indented_lines(self):
+        """Test indented transaction lines are still parsed"""
+        text = "  01/04/2024 Salary Payment ACME £3,500.00\n\t05/04/2024 Dividend Income £120.50\n"
+        result = self.processor._process_bank_statement(text)
+
+        income = [(i['type'], i['amount'], i['date']) for i in result.income_streams]
+        self.assertEqual(income, [('Employment', 3500.00, '01/04/2024'), ('Investment', 120.50, '05/04/2024')])
+
+    def test_filename_hint(self):
+        """Test only unambiguous file names decide the document type"""
+        self.assertEqual(self.processor._filename_hint('/docs/P60_2024.txt'), 'P60')
+        self.assertEqual(self.processor._filename_hint('/docs/bank_march.csv'), 'bank_statement')
+        self.assertIsNone(self.processor._filename_hint('/docs/annual_statement.txt'))
+        self.assertIsNone(self.processor._filename_hint('/docs/bank_p60_scan.txt'))
+        self.assertEqual(self.processor._filename_hint('/docs/2024-p60.txt'), 'P60')
+        self.assertIsNone(self.processor._filename_hint('/docs/Embankment_lease.txt'))
+        self.assertIsNone(self.processor._filename_hint('/docs/sp600_notes.txt'))
+        self.assertIsNone(self.processor._filename_hint('/bank/notes.txt'))
+
+    def test_unextracted_document_is_an_error(self):
+        """Test a document with no extracted text is not processed by its file name"""
+        with tempfile.TemporaryDirectory() as directory:
+            pdf_path = os.path.join(directory, 'p60_2024.pdf')
+            with open(pdf_path, 'wb') as file:
+                file.write(b'%PDF-1.7')
+
+            for path in (pdf_path, os.path.join(directory, 'p60_missing.txt')):
+                with self.subTest(path=path):
+                    result = self.processor.process_document(path)
+                    self.assertFalse(result['processed'])
+                    self.assertTrue(result['error'].startswith('Error extracting text: '))
+                    self.assertNotIn('extracted_data', result)
+
+    def test_batch_records_failures_per_document(self):
+        """Test a failing document is recorded without aborting the batch"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for name, text in (('p60.txt', P60_TEXT), ('statement.txt', STATEMENT_TEXT)):
+                path = os.path.join(directory, name)
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(text)
+                paths.append(path)
+
+            results = batch_process_documents(paths)
+            self.assertEqual(list(results), paths)
+            self.assertEqual(results[paths[0]]['raw_text'], P60_TEXT)
+
+            # A lambda cannot be pickled for a worker process
+            with mock.patch('os.cpu_count', return_value=2), \
+                 mock.patch('functions.document_processing_tools._POOL_MIN_BYTES', 0):
+                results = batch_process_documents(paths, anthropic_api_key=lambda: None)
+            self.assertEqual(list(results), paths)
+            for result in results.values():
+                self.assertFalse(result['processed'])
+                self.assertTrue(result['error'])
+
+    def test_small_batch_stays_in_process(self):
+        """Test a batch below the size threshold does not start a process pool"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for name in ('a.txt', 'b.txt', 'c.txt'):
+                path = os.path.join(directory, name)
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(STATEMENT_TEXT)
+                paths.append(path)
+
+            with mock.patch('os.cpu_count', return_value=4), \
+                 mock.patch('functions.document_processing_tools.ProcessPoolExecutor') as pool:
+                results = batch_process_documents(paths)
+
+            pool.assert_not_called()
+            self.assertEqual(list(results), paths)
+            self.assertTrue(all('metadata' in result for result in results.values()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# //tests/test_main.py
+# [Version 15-10-2026 09:00:00]
+# Main Entry Point Test Suite for Tax Optimization AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+
+STATEMENT_TEXT = """Bank Statement - Current Account
+01/04/2024 Salary Payment ACME £3,500.00
+03/04/2024 Boiler repair £250.00
+05/04/2024 Dividend Income £120.50
+"""
+
+class TestMain(unittest.TestCase):
+    """Test the main workflow helpers"""
+
+    def test_process_documents_skips_raw_text(self):
+        """Test documents processed for consolidation carry no raw text preview"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for name in ('march.txt', 'april.txt'):
+                path = os.path.join(directory, name)
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(STATEMENT_TEXT)
+                paths.append(path)
+
+            with mock.patch.object(main, 'consolidate_extracted_data',
+                                   wraps=main.consolidate_extracted_data) as consolidate:
+                income_data = main.process_documents(paths)
+
+        results = consolidate.call_args.args[0]
+        self.assertEqual(list(results), paths)
+        for result in results.values():
+            self.assertIn('extracted_data', result)
+            self.assertNotIn('raw_text', result)
+        self.assertEqual(income_data['employment_income'], 7000.00)
+        self.assertEqual(income_data['investment_income'], {'dividends': 241.00})
+
+    def test_manual_amounts_are_asked_again(self):
+        """Test a bad manual amount is asked for again instead of failing at the end"""
+        answers = ['60k', '60000', '', '4,000', '4000', '', 'abc', '']
+        with mock.patch('builtins.input', side_effect=answers), \
+             mock.patch('builtins.print'), \
+             mock.patch('sys.stdin') as stdin, \
+             mock.patch.object(main, 'process_tax_calculation') as process:
+            stdin.isatty.return_value = True
+            main.manual_input_mode()
+
+        process.assert_called_once_with({
+            'employment_income': 60000.0,
+            'investment_income': {'dividends': 4000.0}
+        })
+
+if __name__ == '__main__':
+    unittest.main()
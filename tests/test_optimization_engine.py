@@ -0,0 +1,69 @@
+# //tests/test_optimization_engine.py
+# [Version 15-10-2026 09:00:00]
+# Optimization Engine Test Suite for Tax Optimization AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+import json
+import unittest
+
+from functions.uk_tax_calculations import calculate_comprehensive_tax_liability
+from functions.optimization_engine_functions import (
+    _VECTORIZED_SORT_THRESHOLD, OptimizationPriority, OptimizationRecommendation, TaxOptimizationEngine
+)
+
+def _recommendation(index: int, potential_saving: float, deadline: str = None) -> OptimizationRecommendation:
+    return OptimizationRecommendation(
+        id=f"REC_{index}",
+        category="Test",
+        title=f"Recommendation {index}",
+        description="",
+        potential_saving=potential_saving,
+        priority=OptimizationPriority.MEDIUM,
+        deadline=deadline,
+        next_steps=[],
+        requirements=[]
+    )
+
+class TestOptimizationEngine(unittest.TestCase):
+    """Test optimization recommendation functions"""
+
+    def setUp(self):
+        self.engine = TaxOptimizationEngine()
+
+    def test_large_list_order_matches_sorted(self):
+        """Test the vectorized ordering of a long list matches sorted, ties included"""
+        # Savings repeat every 7 items and deadlines every 3, so scores tie
+        recommendations = [
+            _recommendation(i, (i % 7) * 2500.0, "2025-04-05" if i % 3 == 0 else None)
+            for i in range(_VECTORIZED_SORT_THRESHOLD * 2)
+        ]
+        expected = sorted(
+            recommendations,
+            key=lambda rec: rec.potential_saving / 10000 + (0.5 if rec.deadline == "2025-04-05" else 0.0),
+            reverse=True
+        )
+
+        result = self.engine._prioritize_recommendations(recommendations)
+
+        self.assertEqual([rec.id for rec in result], [rec.id for rec in expected])
+
+    def test_dict_shaped_tax_result(self):
+        """Test a tax result loaded back from JSON gives the same recommendations"""
+        tax_result = calculate_comprehensive_tax_liability({
+            'employment_income': 80000,
+            'pension_contributions': 5000,
+            'investment_income': {'dividends': 4000}
+        })
+        loaded = json.loads(json.dumps(tax_result, default=lambda result: result.to_dict()))
+
+        expected = self.engine.generate_optimization_recommendations(tax_result)
+        result = self.engine.generate_optimization_recommendations(loaded)
+
+        self.assertEqual(self.engine._extract_context(loaded), self.engine._extract_context(tax_result))
+        self.assertEqual(self.engine._extract_context(loaded).dividend_income, 4000)
+        self.assertEqual([rec.id for rec in result['all_recommendations']],
+                         [rec.id for rec in expected['all_recommendations']])
+        self.assertIn('PENSION_OPTIMIZATION', [rec.id for rec in result['all_recommendations']])
+
+if __name__ == '__main__':
+    unittest.main()
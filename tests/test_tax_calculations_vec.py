@@ -0,0 +1,99 @@
+# //tests/test_tax_calculations_vec.py
+# [Version 15-10-2026 09:00:00]
+# Batched Tax Calculation Test Suite for Tax Optimization AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+import unittest
+
+import numpy as np
+
+from functions.uk_tax_calculations import DEFAULT_CALCULATOR, calculate_comprehensive_tax_liability
+from functions.uk_tax_calculations_vec import calculate_comprehensive_tax_liability_vec, calculate_income_tax_vec
+
+TAXPAYERS = [
+    {'employment_income': 0},
+    {'employment_income': 12570, 'self_employment_income': 6515},
+    {'employment_income': 50000, 'pension_contributions': 5000, 'dividends': 4000},
+    {'employment_income': 60000, 'gift_aid_donations': 800, 'rental_gross_income': 12000,
+     'rental_expenses': 3000, 'rental_mortgage_interest': 1000},
+    {'employment_income': 110000, 'rental_gross_income': 9000, 'property_allowance_election': True,
+     'property_gains': 20000, 'other_gains': 5000, 'capital_losses': 2000},
+    {'employment_income': 250000, 'self_employment_income': 60000, 'dividends': 30000}
+]
+
+def _scalar_input(row):
+    """Build the nested input dict used by the scalar calculation"""
+    return {
+        'employment_income': row.get('employment_income', 0),
+        'pension_contributions': row.get('pension_contributions', 0),
+        'gift_aid_donations': row.get('gift_aid_donations', 0),
+        'self_employment_income': row.get('self_employment_income', 0),
+        'rental_income': {
+            'gross_income': row.get('rental_gross_income', 0),
+            'expenses': row.get('rental_expenses', 0),
+            'mortgage_interest': row.get('rental_mortgage_interest', 0),
+            'property_allowance_election': row.get('property_allowance_election', False)
+        },
+        'investment_income': {'dividends': row.get('dividends', 0)},
+        'capital_gains': [
+            {'type': 'property', 'amount': row.get('property_gains', 0)},
+            {'type': 'shares', 'amount': row.get('other_gains', 0)},
+            {'type': 'shares', 'amount': -row.get('capital_losses', 0)}
+        ]
+    }
+
+class TestTaxCalculationsVec(unittest.TestCase):
+    """Test batched tax calculations against the scalar calculator"""
+
+    def assertMatchesScalar(self, batch, scalar, row, path=()):
+        """Assert a batch result has the scalar result's keys and, at row, its values"""
+        if hasattr(scalar, 'to_dict'):
+            scalar = scalar.to_dict()
+        if isinstance(scalar, dict):
+            self.assertEqual(set(batch), set(scalar), path)
+            for key, value in scalar.items():
+                self.assertMatchesScalar(batch[key], value, row, path + (key,))
+        else:
+            self.assertEqual(batch[row], scalar, path)
+
+    def test_matches_scalar_calculation(self):
+        """Test every taxpayer in a batch matches the scalar result field by field"""
+        names = {name for row in TAXPAYERS for name in row}
+        columns = {name: [row.get(name, 0) for row in TAXPAYERS] for name in names}
+        batch = calculate_comprehensive_tax_liability_vec(columns)
+
+        for i, row in enumerate(TAXPAYERS):
+            scalar = calculate_comprehensive_tax_liability(_scalar_input(row))
+            self.assertEqual(set(batch), set(scalar))
+            for key in scalar.keys() - {'calculation_date', 'tax_year'}:
+                with self.subTest(taxpayer=i, key=key):
+                    self.assertMatchesScalar(batch[key], scalar[key], i, (key,))
+
+    def test_missing_columns_default_to_zero(self):
+        """Test a batch with only employment income"""
+        batch = calculate_comprehensive_tax_liability_vec({'employment_income': np.array([0.0, 50000.0])})
+
+        self.assertEqual(batch['tax_calculations']['income_tax']['personal_allowance'].tolist(), [12570, 12570])
+        self.assertEqual(batch['total_liability']['capital_gains_tax'].tolist(), [0.0, 0.0])
+        self.assertEqual(batch['effective_tax_rate'][0], 0.0)
+
+    def test_scalar_and_array_inputs_broadcast(self):
+        """Test a scalar income with array reliefs gives one result per relief"""
+        pension_contributions = [0, 5000, 60000]
+        gift_aid_donations = [0, 800, 0]
+        batch = calculate_income_tax_vec(110000, pension_contributions, gift_aid_donations)
+
+        for i, (pension, gift_aid) in enumerate(zip(pension_contributions, gift_aid_donations)):
+            scalar = DEFAULT_CALCULATOR.calculate_income_tax(110000, pension, gift_aid).to_dict()
+            for key, value in scalar.items():
+                column = batch[key]
+                if key == 'tax_bands':
+                    for band, band_value in value.items():
+                        self.assertEqual(column[band].shape, (3,))
+                        self.assertEqual(column[band][i], band_value)
+                else:
+                    self.assertEqual(column.shape, (3,), key)
+                    self.assertEqual(column[i], value, key)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# //tests/test_tax_kernels_cy.py
+# [Version 15-10-2026 09:00:00]
+# Compiled Tax Kernel Test Suite for Tax Optimization AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+import itertools
+import unittest
+
+from functions import uk_tax_calculations
+from functions.uk_tax_calculations import _PYTHON_KERNELS, DEFAULT_THRESHOLDS as T
+
+try:
+    from functions import uk_tax_calculations_cy
+except ImportError:
+    uk_tax_calculations_cy = None
+
+# Incomes around every band edge and the allowance taper
+INCOMES = (0.0, 500.0, 12570.0, 12570.01, 37700.0, 50270.0, 50270.5, 99999.99, 100000.0,
+           100001.0, 112570.0, 125140.0, 125140.01, 250000.0, 1234567.89)
+
+# Kernel arguments for each income
+KERNEL_ARGS = {
+    "dividend_tax_basic": lambda x: [(x,)],
+    "dividend_tax_higher": lambda x: [(x, remaining) for remaining in (0.0, 1000.0, x / 2, x + 1)],
+    "dividend_tax_additional": lambda x: [(x, remaining, 74870.0) for remaining in (0.0, 1000.0, x / 2)],
+    "personal_allowance": lambda x: [(x, T.personal_allowance), (x, T.personal_allowance + 500)],
+    "tax_bands": lambda x: [(x, T.basic_rate_threshold + gift_aid, T.higher_rate_threshold + gift_aid,
+                             T.basic_rate, T.higher_rate, T.additional_rate) for gift_aid in (0.0, 1000.0)],
+    "ni_contribution": lambda x: [(x, T.ni_threshold, T.ni_upper_threshold, T.ni_basic_rate, T.ni_higher_rate),
+                                  (x, T.ni_threshold, T.ni_upper_threshold, 0.09, T.ni_higher_rate)]
+}
+
+@unittest.skipIf(uk_tax_calculations_cy is None, "Cython kernels not built (python setup.py build_ext --inplace)")
+class TestCompiledKernels(unittest.TestCase):
+    """Test the compiled kernels against the Python kernels"""
+
+    def test_kernels_match_python(self):
+        """Test every compiled kernel gives the Python kernel's exact figures"""
+        self.assertEqual(set(KERNEL_ARGS), set(_PYTHON_KERNELS))
+        for name, python_kernel in _PYTHON_KERNELS.items():
+            compiled_kernel = getattr(uk_tax_calculations_cy, name)
+            for args in itertools.chain.from_iterable(KERNEL_ARGS[name](x) for x in INCOMES):
+                with self.subTest(kernel=name, args=args):
+                    self.assertEqual(compiled_kernel(*args), python_kernel(*args))
+
+    def test_compiled_kernels_are_used(self):
+        """Test the calculator module picked up the compiled kernels"""
+        for name in _PYTHON_KERNELS:
+            self.assertIs(getattr(uk_tax_calculations, f"_{name}"), getattr(uk_tax_calculations_cy, name))
+
+if __name__ == '__main__':
+    unittest.main()
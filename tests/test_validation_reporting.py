@@ -0,0 +1,137 @@
+# //tests/test_validation_reporting.py
+# [Version 15-10-2026 09:00:00]
+# Validation & Reporting Test Suite for Tax Optimization AI
+# Authored by: Sotiris Spyrou, CEO, VerityAI
+
+import json
+import unittest
+
+import numpy as np
+
+from functions.uk_tax_calculations import calculate_comprehensive_tax_liability
+from functions.uk_tax_calculations_vec import calculate_comprehensive_tax_liability_vec
+from functions.validation_reporting_functions import (
+    DEFAULT_VALIDATOR, batch_validation_columns, run_complete_validation_and_reporting
+)
+
+class TestValidationReporting(unittest.TestCase):
+    """Test validation and report generation"""
+
+    def setUp(self):
+        self.tax_result = calculate_comprehensive_tax_liability({
+            'employment_income': 60000,
+            'pension_contributions': 5000
+        })
+
+    def test_formatted_outputs_are_opt_in(self):
+        """Test formatted outputs are only built when requested"""
+        result = run_complete_validation_and_reporting(self.tax_result)
+
+        self.assertNotIn('formatted_outputs', result['report_package'])
+        self.assertTrue(result['processing_summary']['validation_passed'])
+
+    def test_formatted_outputs(self):
+        """Test JSON export and text summary match the report data"""
+        result = run_complete_validation_and_reporting(
+            self.tax_result, formats=('json', 'text'), generated_date='2025-01-31T09:00:00'
+        )
+        package = result['report_package']
+        outputs = package['formatted_outputs']
+
+        self.assertEqual(json.loads(outputs['json_export']), package['report_data'])
+        self.assertIn('Generated: 2025-01-31T09:00:00', outputs['text_summary'])
+
+    def test_batch_matches_single_validation(self):
+        """Test batch validation gives each record the single submission result"""
+        columns = {
+            'employment_income': [-100, 60000, 1500000, 0],
+            'rental_gross_income': [0, 10000, -500, 0],
+            'rental_expenses': [0, 15000, 0, 0]
+        }
+        batch = DEFAULT_VALIDATOR.validate_batch(
+            batch_validation_columns(calculate_comprehensive_tax_liability_vec(columns))
+        )
+
+        for i in range(4):
+            single = DEFAULT_VALIDATOR.validate_complete_submission(calculate_comprehensive_tax_liability({
+                'employment_income': columns['employment_income'][i],
+                'rental_income': {
+                    'gross_income': columns['rental_gross_income'][i],
+                    'expenses': columns['rental_expenses'][i]
+                }
+            }))
+            self.assertEqual(batch.row_result(i), single)
+
+    def test_dict_shaped_tax_result(self):
+        """Test a tax result loaded back from JSON validates and reports like the result objects"""
+        tax_result = calculate_comprehensive_tax_liability({
+            'employment_income': 60000,
+            'rental_income': {'gross_income': 10000, 'expenses': 15000}
+        })
+        loaded = json.loads(json.dumps(tax_result, default=lambda result: result.to_dict()))
+
+        expected = DEFAULT_VALIDATOR.validate_complete_submission(tax_result)
+        self.assertIn("Rental expenses appear high relative to income", expected.warnings)
+        self.assertEqual(DEFAULT_VALIDATOR.validate_complete_submission(loaded), expected)
+
+        report = run_complete_validation_and_reporting(loaded, generated_date='2025-01-31T09:00:00')
+        self.assertEqual(report['report_package']['report_data']['tax_breakdown']['income_tax']['taxable_income'],
+                         tax_result['tax_calculations']['income_tax'].taxable_income)
+
+    def test_dict_shaped_bad_values(self):
+        """Test dict-shaped input with bad values is reported, not passed as all clear"""
+        result = DEFAULT_VALIDATOR.validate_complete_submission({
+            'income_breakdown': {
+                'employment': -100,
+                'rental': {'gross_rental_income': -500, 'allowable_expenses': 0}
+            },
+            'tax_calculations': {
+                'income_tax': {'gross_income': 10000, 'total_tax': -50}
+            }
+        })
+
+        self.assertFalse(result.is_valid)
+        self.assertEqual(result.errors, (
+            "Employment income cannot be negative",
+            "Gross rental income cannot be negative",
+            "Effective tax rate cannot be negative"
+        ))
+
+    def test_batch_matches_single_validation_on_boundaries(self):
+        """Test both validation paths agree on values at and just past every threshold"""
+        # employment, gross rental, rental expenses, income tax gross income,
+        # income tax, income tax liability
+        rows = [
+            (0, 0, 0, 0, 0, 0),
+            (-0.01, -0.01, 0, 10000, -0.01, 0),
+            (1000000, 1000, 1200, 10000, 5000, 100000),
+            (1000000.01, 1000, 1200.01, 10000, 5000.01, 100000.01),
+            (50000, 0, 1, 0, 10, 0)
+        ]
+        names = ('employment_income', 'gross_rental_income', 'rental_expenses',
+                 'income_tax_gross_income', 'income_tax_total', 'income_tax_liability')
+        batch = DEFAULT_VALIDATOR.validate_batch({name: np.array(column) for name, column in zip(names, zip(*rows))})
+
+        for i, (employment, gross_rental, expenses, gross_income, total_tax, liability) in enumerate(rows):
+            single = DEFAULT_VALIDATOR.validate_complete_submission({
+                'income_breakdown': {
+                    'employment': employment,
+                    'rental': {'gross_rental_income': gross_rental, 'allowable_expenses': expenses}
+                },
+                'tax_calculations': {'income_tax': {'gross_income': gross_income, 'total_tax': total_tax}},
+                'total_liability': {'income_tax': liability}
+            })
+            with self.subTest(row=i):
+                self.assertEqual(batch.row_result(i), single)
+
+        # Values on the thresholds raise nothing; just past them, every check fires
+        self.assertEqual(batch.row_result(2).warnings, ())
+        self.assertEqual(batch.row_result(1).errors, (
+            "Employment income cannot be negative",
+            "Gross rental income cannot be negative",
+            "Effective tax rate cannot be negative"
+        ))
+        self.assertEqual(len(batch.row_result(3).warnings), 4)
+
+if __name__ == '__main__':
+    unittest.main()